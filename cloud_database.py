@@ -19,6 +19,12 @@ _cache = {}
 CACHE_TTL = 300  # 5 minutes for cloud data
 MAX_CACHE_SIZE = 200
 
+# quota_limit stored for "no limit" (the column is NOT NULL)
+UNLIMITED_QUOTA = 2**31 - 1
+
+# Providers a user_cloud_permissions row can be scoped to
+PERMISSION_PROVIDERS = ('aws', 'gcp', 'azure', 'all')
+
 def get_cached(key: str) -> Optional[Any]:
     """Get item from cache if not expired"""
     if key in _cache:
@@ -491,6 +497,107 @@ def release_quota(project_id: str, resource_type: str, region: str, amount: int
     clear_cache(f"quota:{project_id}:{resource_type}")
 
 
+def set_quotas_bulk(project_id: str, quotas: Dict[str, int], region: str = None) -> bool:
+    """
+    Set several quota limits for a project in a single transaction
+    
+    Existing rows keep their usage counters; missing rows are created.
+    
+    Args:
+        project_id: Project identifier
+        quotas: Mapping of resource_type -> quota limit
+        region: Region the quotas apply to (None = all regions)
+    
+    Returns:
+        True if the quotas were written
+    """
+    update_rows = [(limit, project_id, resource_type, region) for resource_type, limit in quotas.items()]
+    insert_rows = [
+        (project_id, resource_type, region, limit, project_id, resource_type, region)
+        for resource_type, limit in quotas.items()
+    ]
+    
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    
+    try:
+        with conn:  # One BEGIN ... COMMIT for every row
+            conn.executemany("""
+                UPDATE cloud_quotas
+                SET quota_limit = ?, updated_at = strftime('%s', 'now')
+                WHERE project_id = ? AND resource_type = ? AND region IS ?
+            """, update_rows)
+            
+            conn.executemany("""
+                INSERT INTO cloud_quotas (project_id, resource_type, region, quota_limit)
+                SELECT ?, ?, ?, ?
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM cloud_quotas
+                    WHERE project_id = ? AND resource_type = ? AND region IS ?
+                )
+            """, insert_rows)
+        return True
+    
+    except Exception as e:
+        print(f"Error setting quotas for {project_id}: {e}")
+        return False
+    
+    finally:
+        conn.close()
+        for resource_type in quotas:
+            clear_cache(f"quota:{project_id}:{resource_type}")
+
+
+def set_quota(project_id: str, resource_type: str, limit: Optional[int], region: str = None) -> bool:
+    """
+    Set one quota limit for a project
+    
+    Args:
+        limit: Maximum allowed, or None for unlimited
+    
+    Returns:
+        True if the quota was written (False if the project doesn't exist)
+    """
+    if get_cloud_project(project_id) is None:
+        return False
+    
+    if limit is None:
+        limit = UNLIMITED_QUOTA
+    
+    return set_quotas_bulk(project_id, {resource_type: limit}, region)
+
+
+def get_project_quotas(project_id: str) -> Optional[Dict[str, Dict]]:
+    """
+    Quota limits and usage for a project
+    
+    Returns:
+        resource_type -> {'limit': int or 'unlimited', 'used': int, 'region': str or None},
+        or None if the project doesn't exist
+    """
+    if get_cloud_project(project_id) is None:
+        return None
+    
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    
+    try:
+        rows = conn.execute("""
+            SELECT resource_type, region, quota_limit, quota_used FROM cloud_quotas
+            WHERE project_id = ?
+            ORDER BY resource_type
+        """, (project_id,)).fetchall()
+    finally:
+        conn.close()
+    
+    return {
+        resource_type: {
+            'limit': 'unlimited' if limit >= UNLIMITED_QUOTA else limit,
+            'used': used,
+            'region': region
+        }
+        for resource_type, region, limit, used in rows
+    }
+
+
 # --- EPHEMERAL SESSION MANAGEMENT ---
 
 def create_deployment_session(project_id: str, user_id: str, guild_id: str, 
@@ -555,6 +662,102 @@ def get_deployment_session(session_id: str) -> Optional[Dict]:
     return None
 
 
+def get_all_deployment_sessions(project_id: str = None, state: str = None,
+                                limit: int = 15, offset: int = 0) -> List[Dict]:
+    """
+    List deployment sessions across all users (admin view)
+    
+    Filtering, ordering and paging happen in SQLite so the cost does not
+    grow with the total number of sessions.
+    
+    Args:
+        project_id: Filter by project
+        state: Filter by session status
+        limit: Max results
+        offset: Pagination offset
+    
+    Returns:
+        List of session dicts, newest first
+    """
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    query = "SELECT * FROM deployment_sessions WHERE 1=1"
+    params = []
+    
+    if project_id:
+        query += " AND project_id = ?"
+        params.append(project_id)
+    
+    if state:
+        query += " AND status = ?"
+        params.append(state)
+    
+    query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+    params.extend([limit, offset])
+    
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    
+    sessions = []
+    for row in rows:
+        session = dict(row)
+        if session.get('resources_pending'):
+            session['resources_pending'] = json.loads(session['resources_pending'])
+        sessions.append(session)
+    
+    return sessions
+
+
+def get_user_deployment_sessions(user_id: str, include_expired: bool = False,
+                                 limit: int = None) -> List[Dict]:
+    """
+    List a user's deployment sessions in a single query
+    
+    Expiry filtering and the row limit are applied in SQLite, so callers
+    don't load and discard sessions they won't show.
+    
+    Args:
+        user_id: Session owner
+        include_expired: Also return sessions past expires_at
+        limit: Max results (None for all)
+    
+    Returns:
+        List of session dicts, newest first
+    """
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    
+    query = "SELECT * FROM deployment_sessions WHERE user_id = ?"
+    params = [str(user_id)]
+    
+    if not include_expired:
+        query += " AND expires_at > ?"
+        params.append(time.time())
+    
+    query += " ORDER BY created_at DESC"
+    
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+    
+    sessions = []
+    for row in rows:
+        session = dict(row)
+        if session.get('resources_pending'):
+            session['resources_pending'] = json.loads(session['resources_pending'])
+        sessions.append(session)
+    
+    return sessions
+
+
 def cleanup_expired_sessions():
     """Clean up expired sessions (run periodically)"""
     conn = sqlite3.connect(CLOUD_DB_FILE)
@@ -647,6 +850,49 @@ def complete_deployment_session(session_id: str, status: str = 'completed'):
     clear_cache(f"session:{session_id}")
 
 
+
+def cancel_deployment_session(session_id: str, user_id: str) -> str:
+    """
+    Cancel a session if it belongs to user_id and hasn't started deploying
+    
+    Ownership, state and expiry are checked by the UPDATE itself, so a
+    successful cancel is a single statement. The follow-up SELECT only
+    runs to explain a refusal.
+    
+    Returns: 'ok', 'not_found', 'forbidden' or 'bad_state'
+    """
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    cursor = conn.cursor()
+    now = time.time()
+    
+    try:
+        cursor.execute("""
+            UPDATE deployment_sessions
+            SET status = 'cancelled', completed_at = strftime('%s', 'now')
+            WHERE session_id = ? AND user_id = ?
+              AND status IN ('pending', 'approved') AND expires_at > ?
+        """, (session_id, user_id, now))
+        conn.commit()
+        
+        if cursor.rowcount:
+            return 'ok'
+        
+        cursor.execute("""
+            SELECT user_id, status, expires_at FROM deployment_sessions
+            WHERE session_id = ?
+        """, (session_id,))
+        row = cursor.fetchone()
+    finally:
+        conn.close()
+        clear_cache(f"session:{session_id}")
+    
+    if row is None or row[2] <= now or row[1] == 'expired':
+        return 'not_found'
+    if row[0] != user_id:
+        return 'forbidden'
+    return 'bad_state'
+
+
 # --- USER PERMISSIONS ---
 
 def get_user_permissions(user_id: str, guild_id: str, provider: str = 'all') -> Optional[Dict]:
@@ -705,6 +951,33 @@ def grant_user_permission(user_id: str, guild_id: str, role_name: str, provider:
     clear_cache(f"perms:{user_id}:{guild_id}:{provider}")
 
 
+def revoke_user_permission(user_id: str, guild_id: str, provider: str = 'all') -> bool:
+    """
+    Remove a user's cloud infrastructure permissions for one provider scope
+    
+    Returns:
+        True if a permission row was removed
+    """
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    
+    try:
+        with conn:
+            cursor = conn.execute("""
+                DELETE FROM user_cloud_permissions
+                WHERE user_id = ? AND guild_id = ? AND provider = ?
+            """, (user_id, guild_id, provider))
+        removed = cursor.rowcount > 0
+    finally:
+        conn.close()
+    
+    # get_user_permissions caches per requested provider, and an 'all'
+    # row is cached under every one of them
+    for cached_provider in PERMISSION_PROVIDERS:
+        clear_cache(f"perms:{user_id}:{guild_id}:{cached_provider}")
+    
+    return removed
+
+
 # --- INFRASTRUCTURE POLICIES ---
 
 def create_policy(guild_id: str, policy_name: str, policy_type: str, 
@@ -1032,6 +1305,52 @@ def log_audit_event(event_type: str, user_id: str, guild_id: str, action: str,
     return log_id
 
 
+
+def log_audit_events_bulk(events: List[Dict]) -> int:
+    """
+    Write many audit events in one transaction
+    
+    Args:
+        events: Dicts with the log_audit_event arguments (event_type, user_id,
+            guild_id, action, details, project_id, ...) and optionally
+            'timestamp' for when the event happened
+    
+    Returns:
+        Number of events written
+    """
+    now = time.time()
+    rows = [(
+        event['event_type'],
+        event['user_id'],
+        event['guild_id'],
+        event.get('project_id'),
+        event.get('session_id'),
+        event.get('resource_id'),
+        event['action'],
+        json.dumps(event['details']) if event.get('details') else None,
+        event.get('ip_address'),
+        event.get('user_agent'),
+        event.get('status', 'success'),
+        event.get('error_message'),
+        event.get('timestamp', now)
+    ) for event in events]
+    
+    conn = sqlite3.connect(CLOUD_DB_FILE)
+    
+    try:
+        with conn:
+            conn.executemany("""
+                INSERT INTO audit_logs
+                (event_type, user_id, guild_id, project_id, session_id, resource_id,
+                 action, details, ip_address, user_agent, status, error_message, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+    finally:
+        conn.close()
+    
+    return len(rows)
+
+
 def get_audit_logs(guild_id: str = None, user_id: str = None, project_id: str = None,
                    event_type: str = None, limit: int = 100, offset: int = 0) -> List[Dict]:
     """
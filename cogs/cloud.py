@@ -877,10 +877,11 @@ class DeploymentLobbyView(discord.ui.View):
             if plan.get('resource_changes'):
                 changes_text = "\n".join([
                     f"• `{rc['resource']}`: {rc['action_summary']}"
-                    for rc in plan['resource_changes'][:10]
+                    for rc in plan['resource_changes']
                 ])
-                if len(plan['resource_changes']) > 10:
-                    changes_text += f"\n... and {len(plan['resource_changes']) - 10} more"
+                hidden = plan['resource_change_count'] - len(plan['resource_changes'])
+                if hidden > 0:
+                    changes_text += f"\n... and {hidden} more"
                 
                 embed.add_field(
                     name="🔧 Resource Changes",
@@ -1564,12 +1565,16 @@ class CloudCog(commands.Cog):
         
         print("✅ [CloudCog] Loaded with memory optimization")
     
-    def cog_unload(self):
+    async def cog_unload(self):
         """Cleanup on cog unload"""
         self.cleanup_sessions.cancel()
         self.jit_permission_janitor.cancel()
         self.cleanup_blueprints.cancel()
         
+        # Let scheduled validator temp-dir removals finish (also runs on
+        # bot shutdown, which unloads every cog)
+        await TerraformValidator.wait_for_cleanup()
+        
         # Clear caches
         if MEMORY_OPT:
             memory_optimizer.clear_all_caches()
@@ -1722,9 +1727,12 @@ class CloudCog(commands.Cog):
                 print("⚠️ [CloudCog] No AI API keys found. AI features will be limited.")
                 self.ai_advisor = None
             
-            # Initialize terraform validator (works without AI)
+            # Initialize terraform validator (works without AI), reusing the
+            # bot-wide instance so its availability probe is shared
             try:
-                self.terraform_validator = TerraformValidator()
+                if getattr(self.bot, 'terraform_validator', None) is None:
+                    self.bot.terraform_validator = TerraformValidator()
+                self.terraform_validator = self.bot.terraform_validator
                 print("✅ [CloudCog] Terraform Validator initialized")
             except Exception as tf_error:
                 print(f"⚠️ [CloudCog] Terraform Validator initialization failed: {tf_error}")
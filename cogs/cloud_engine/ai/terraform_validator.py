@@ -4,13 +4,145 @@ Validates generated terraform configurations using terraform validate and plan
 """
 
 import asyncio
+import mmap
 import os
+import re
 import json
+import shutil
+import time
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
+# orjson parses multi-MB plan documents several times faster than stdlib json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+# Exit codes used by the chained shell pipelines to report which step failed
+_INIT_FAILED = 64
+_PLAN_FAILED = 65
+
+# init and validate share one process start instead of two
+_VALIDATE_PIPELINE = f"""
+"$0" init -no-color -input=false >/dev/null || exit {_INIT_FAILED}
+exec "$0" validate -json
+"""
+
+# plan writes its human-readable summary to stderr; show -json owns stdout
+_PLAN_PIPELINE = f"""
+"$0" plan -out=tfplan -no-color -input=false >&2 || exit {_PLAN_FAILED}
+exec "$0" show -json tfplan
+"""
+
+# Plan summary line, e.g. "Plan: 5 to add, 0 to change, 0 to destroy."
+_PLAN_RE = re.compile(rb'Plan:\s+(\d+)\s+to\s+add,\s+(\d+)\s+to\s+change,\s+(\d+)\s+to\s+destroy')
+_NO_CHANGES = (b'No changes', b'Your infrastructure matches the configuration')
+
+# Resource changes built into plan_summary; the rest are only counted
+RESOURCE_CHANGES_LIMIT = 10
+
+# How long a `terraform version` probe result stays valid (seconds)
+_AVAILABILITY_TTL = 3600
+
+# Upper bound on terraform processes running at once across all validators
+_MAX_CONCURRENCY = int(os.environ.get("TF_MAX_CONCURRENCY", os.cpu_count() or 4))
+
+
+def _loads(buf) -> Dict:
+    """
+    Parse terraform JSON output from bytes or a memoryview
+    
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+    need to catch the stdlib exception.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(buf)
+    return json.loads(bytes(buf))
+
+
+def _write_atomic(path: Path, data: bytes):
+    """
+    Write a file so readers never observe partial content
+    
+    The temp name doesn't end in .tf, so terraform ignores it.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class CommandResult:
+    """
+    Captured output of a terraform process
+    
+    Output is kept as raw bytes and only decoded when a caller reads the
+    text properties; JSON consumers parse the bytes directly.
+    
+    Large stdout (e.g. `show -json`) can be spooled to a temp file instead
+    of a pipe; it is then memory-mapped on first access. Use the result as
+    a context manager so the mapping and file are released.
+    """
+    
+    __slots__ = ('returncode', '_stdout_bytes', 'stderr_bytes', '_stdout_file', '_mmap', '_view')
+    
+    def __init__(self, returncode: int, stdout_bytes: Optional[bytes], stderr_bytes: bytes,
+                 stdout_file=None):
+        self.returncode = returncode
+        self._stdout_bytes = stdout_bytes or b''
+        self.stderr_bytes = stderr_bytes or b''
+        self._stdout_file = stdout_file
+        self._mmap = None
+        self._view = None
+    
+    @property
+    def stdout_view(self) -> memoryview:
+        """Zero-copy view of stdout (backed by an mmap when spooled)"""
+        if self._view is None:
+            if self._stdout_file is not None and os.fstat(self._stdout_file.fileno()).st_size:
+                self._mmap = mmap.mmap(self._stdout_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._view = memoryview(self._mmap)
+            else:
+                self._view = memoryview(self._stdout_bytes)
+        return self._view
+    
+    @property
+    def stdout_bytes(self) -> bytes:
+        if self._stdout_file is None:
+            return self._stdout_bytes
+        return bytes(self.stdout_view)
+    
+    @property
+    def stdout(self) -> str:
+        return str(self.stdout_view, 'utf-8', errors='replace')
+    
+    @property
+    def stderr(self) -> str:
+        return self.stderr_bytes.decode('utf-8', errors='replace')
+    
+    def close(self):
+        """Release the stdout mapping and spool file, if any"""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._stdout_file is not None:
+            self._stdout_file.close()
+            self._stdout_file = None
+    
+    def __enter__(self) -> 'CommandResult':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 @dataclass
 class ValidationResult:
@@ -25,8 +157,20 @@ class ValidationResult:
 class TerraformValidator:
     """Validate terraform configurations before deployment"""
     
+    # Shared by every instance: each terraform run loads provider plugins,
+    # so unbounded parallel validations thrash memory and CPU
+    _sem = asyncio.Semaphore(_MAX_CONCURRENCY)
+    _queued = 0
+    
+    # Temp-dir removals still running in worker threads. The event loop
+    # only holds weak references to tasks, so they are kept alive here.
+    _cleanup_tasks = set()
+    
     def __init__(self):
         self.terraform_binary = "terraform"
+        
+        # (available, version output, probed at) from the last version probe
+        self._avail: Optional[Tuple[bool, str, float]] = None
     
     async def validate_and_plan(self, terraform_code: str, provider: str, 
                                work_dir: Optional[str] = None) -> ValidationResult:
@@ -50,35 +194,34 @@ class TerraformValidator:
         
         work_path = Path(work_dir)
         work_path.mkdir(parents=True, exist_ok=True)
+        fmt_task = None
         
         try:
-            # Write terraform code
+            # Write terraform code off the event loop
             tf_file = work_path / "main.tf"
-            tf_file.write_text(terraform_code)
+            await asyncio.to_thread(_write_atomic, tf_file, terraform_code.encode('utf-8'))
             
-            # Step 1: terraform fmt (format check)
-            fmt_result = await self._run_terraform_command(['fmt', '-check'], work_dir)
+            # Step 1: terraform fmt (format check) only reads main.tf, so it
+            # runs alongside init instead of blocking it
+            fmt_task = asyncio.create_task(self._run_terraform_command(['fmt', '-check'], work_dir))
+            
+            # Steps 2-3: init and validate in a single shell
+            validate_result = await self._run_pipeline(_VALIDATE_PIPELINE, work_dir)
             warnings = []
-            if fmt_result.returncode != 0:
-                warnings.append("Terraform formatting issues detected")
             
-            # Step 2: terraform init
-            init_result = await self._run_terraform_command(['init', '-no-color'], work_dir)
-            if init_result.returncode != 0:
+            if validate_result.returncode == _INIT_FAILED:
+                stderr = validate_result.stderr
                 return ValidationResult(
                     is_valid=False,
-                    errors=[f"Terraform init failed: {init_result.stderr}"],
-                    warnings=warnings,
-                    raw_output=init_result.stderr
+                    errors=[f"Terraform init failed: {stderr}"],
+                    warnings=await self._with_fmt_warning(fmt_task, warnings),
+                    raw_output=stderr
                 )
             
-            # Step 3: terraform validate
-            validate_result = await self._run_terraform_command(['validate', '-json'], work_dir)
-            
             errors = []
             if validate_result.returncode != 0:
                 try:
-                    validate_json = json.loads(validate_result.stdout)
+                    validate_json = _loads(validate_result.stdout_bytes)
                     if 'diagnostics' in validate_json:
                         for diag in validate_json['diagnostics']:
                             severity = diag.get('severity', 'error')
@@ -98,81 +241,140 @@ class TerraformValidator:
                 return ValidationResult(
                     is_valid=False,
                     errors=errors,
-                    warnings=warnings,
+                    warnings=await self._with_fmt_warning(fmt_task, warnings),
                     raw_output=validate_result.stdout + "\n" + validate_result.stderr
                 )
             
-            # Step 4: terraform plan
-            plan_result = await self._run_terraform_command(
-                ['plan', '-out=tfplan', '-no-color', '-input=false'],
-                work_dir
-            )
-            
-            if plan_result.returncode != 0:
-                return ValidationResult(
-                    is_valid=False,
-                    errors=[f"Terraform plan failed: {plan_result.stderr}"],
-                    warnings=warnings,
-                    raw_output=plan_result.stderr
-                )
-            
-            # Parse plan output
-            plan_summary = self._parse_plan_output(plan_result.stdout)
-            
-            # Step 5: terraform show -json (get detailed plan)
-            show_result = await self._run_terraform_command(
-                ['show', '-json', 'tfplan'],
-                work_dir
-            )
-            
-            if show_result.returncode == 0:
-                try:
-                    plan_json = json.loads(show_result.stdout)
-                    plan_summary['resource_changes'] = self._extract_resource_changes(plan_json)
-                except json.JSONDecodeError:
-                    pass
+            # Steps 4-5: terraform plan, then show -json for the detailed plan.
+            # Plan text goes to stderr so stdout carries only the JSON document.
+            # The JSON plan can be many MB, so it is spooled to disk rather
+            # than buffered through the pipe.
+            with await self._run_pipeline(_PLAN_PIPELINE, work_dir, spool_stdout=True) as plan_result:
+                plan_output = plan_result.stderr
+                
+                if plan_result.returncode == _PLAN_FAILED:
+                    return ValidationResult(
+                        is_valid=False,
+                        errors=[f"Terraform plan failed: {plan_output}"],
+                        warnings=await self._with_fmt_warning(fmt_task, warnings),
+                        raw_output=plan_output
+                    )
+                
+                # Parse plan output
+                plan_summary = self._parse_plan_output(plan_result.stderr_bytes)
+                
+                if plan_result.returncode == 0:
+                    try:
+                        plan_json = _loads(plan_result.stdout_view)
+                        plan_summary['resource_changes'] = self._extract_resource_changes(
+                            plan_json, RESOURCE_CHANGES_LIMIT
+                        )
+                        plan_summary['resource_change_count'] = len(plan_json.get('resource_changes', ()))
+                    except json.JSONDecodeError:
+                        pass
             
             return ValidationResult(
                 is_valid=True,
                 errors=[],
-                warnings=warnings,
+                warnings=await self._with_fmt_warning(fmt_task, warnings),
                 plan_summary=plan_summary,
-                raw_output=plan_result.stdout
+                raw_output=plan_output
             )
         
         finally:
-            # Cleanup temp directory
+            # Never remove the directory out from under a running fmt check
+            if fmt_task is not None and not fmt_task.done():
+                await asyncio.wait({fmt_task})
+            
+            # Cleanup temp directory in the background; .terraform/ holds
+            # provider binaries and unlinking them shouldn't delay the result
             if cleanup_dir:
-                import shutil
-                try:
-                    shutil.rmtree(work_dir)
-                except Exception as e:
-                    print(f"Warning: Could not cleanup temp dir {work_dir}: {e}")
+                self._schedule_cleanup(work_dir)
+    
+    def _schedule_cleanup(self, work_dir: str):
+        """Remove a temp working directory from a worker thread"""
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(shutil.rmtree, work_dir, ignore_errors=True)
+        )
+        self._cleanup_tasks.add(task)
+        task.add_done_callback(self._cleanup_tasks.discard)
+    
+    @classmethod
+    async def wait_for_cleanup(cls):
+        """Wait for pending temp-dir removals (call on shutdown)"""
+        if cls._cleanup_tasks:
+            await asyncio.gather(*cls._cleanup_tasks, return_exceptions=True)
+    
+    async def _with_fmt_warning(self, fmt_task: asyncio.Task, warnings: List[str]) -> List[str]:
+        """Wait for the concurrent fmt check and prepend its warning if it failed"""
+        fmt_result = await fmt_task
+        if fmt_result.returncode != 0:
+            warnings.insert(0, "Terraform formatting issues detected")
+        return warnings
     
-    async def _run_terraform_command(self, args: List[str], cwd: str) -> asyncio.subprocess.Process:
+    async def _run_terraform_command(self, args: List[str], cwd: str) -> CommandResult:
         """Run terraform command asynchronously"""
+        return await self._run_process([self.terraform_binary, *args], cwd)
+    
+    async def _run_pipeline(self, script: str, cwd: str, spool_stdout: bool = False) -> CommandResult:
+        """
+        Run a chain of terraform commands in one shell process
         
-        process = await asyncio.create_subprocess_exec(
-            self.terraform_binary,
-            *args,
-            cwd=cwd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        The terraform binary is passed as ``$0`` so the script never
+        interpolates user-controlled paths.
+        """
+        return await self._run_process(['sh', '-c', script, self.terraform_binary], cwd, spool_stdout)
+    
+    async def _run_process(self, argv: List[str], cwd: str, spool_stdout: bool = False) -> CommandResult:
+        """
+        Spawn a process and capture its output
+        
+        With spool_stdout, stdout is written straight to an anonymous temp
+        file instead of being copied through the asyncio pipe transport.
+        """
+        # Created before taking a slot, so a failure here (ENOSPC, EMFILE)
+        # can't leak one
+        stdout_file = tempfile.TemporaryFile() if spool_stdout else None
+        try:
+            await self._acquire_slot()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    cwd=cwd,
+                    stdout=stdout_file or asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                
+                stdout, stderr = await process.communicate()
+            finally:
+                self._sem.release()
+        except BaseException:
+            if stdout_file is not None:
+                stdout_file.close()
+            raise
         
-        stdout, stderr = await process.communicate()
+        return CommandResult(process.returncode, stdout, stderr, stdout_file)
+    
+    async def _acquire_slot(self):
+        """Wait for a free terraform slot, reporting long waits"""
+        if not self._sem.locked():
+            await self._sem.acquire()
+            return
         
-        # Create a simple namespace to hold results
-        class Result:
-            def __init__(self, returncode, stdout, stderr):
-                self.returncode = returncode
-                self.stdout = stdout.decode('utf-8') if stdout else ''
-                self.stderr = stderr.decode('utf-8') if stderr else ''
+        cls = type(self)
+        cls._queued += 1
+        started = time.monotonic()
+        try:
+            await self._sem.acquire()
+        finally:
+            cls._queued -= 1
         
-        return Result(process.returncode, stdout, stderr)
+        waited_ms = (time.monotonic() - started) * 1000
+        if waited_ms > 100:
+            print(f"Warning: terraform waited {waited_ms:.0f}ms for a slot ({cls._queued} still queued)")
     
-    def _parse_plan_output(self, plan_output: str) -> Dict:
-        """Parse terraform plan output"""
+    def _parse_plan_output(self, plan_output: bytes) -> Dict:
+        """Parse raw terraform plan output"""
         
         summary = {
             'to_add': 0,
@@ -182,12 +384,7 @@ class TerraformValidator:
         }
         
         # Look for plan summary line
-        # Example: "Plan: 5 to add, 0 to change, 0 to destroy."
-        import re
-        plan_match = re.search(
-            r'Plan:\s+(\d+)\s+to\s+add,\s+(\d+)\s+to\s+change,\s+(\d+)\s+to\s+destroy',
-            plan_output
-        )
+        plan_match = _PLAN_RE.search(plan_output)
         
         if plan_match:
             summary['to_add'] = int(plan_match.group(1))
@@ -196,36 +393,49 @@ class TerraformValidator:
             summary['has_changes'] = (summary['to_add'] + summary['to_change'] + summary['to_destroy']) > 0
         
         # Check for "No changes" message
-        if 'No changes' in plan_output or 'Your infrastructure matches the configuration' in plan_output:
+        if any(marker in plan_output for marker in _NO_CHANGES):
             summary['has_changes'] = False
         
         return summary
     
-    def _extract_resource_changes(self, plan_json: Dict) -> List[Dict]:
-        """Extract resource changes from plan JSON"""
-        
-        changes = []
-        
-        if 'resource_changes' in plan_json:
-            for change in plan_json['resource_changes']:
-                resource_type = change.get('type', '')
-                resource_name = change.get('name', '')
-                actions = change.get('change', {}).get('actions', [])
-                
-                changes.append({
-                    'resource': f"{resource_type}.{resource_name}",
-                    'type': resource_type,
-                    'name': resource_name,
-                    'actions': actions,
-                    'action_summary': ', '.join(actions)
-                })
-        
-        return changes
+    def _extract_resource_changes(self, plan_json: Dict, limit: Optional[int] = None) -> List[Dict]:
+        """Extract resource changes from plan JSON (at most `limit` entries)"""
+        return list(islice(self._iter_resource_changes(plan_json), limit))
+    
+    def _iter_resource_changes(self, plan_json: Dict) -> Iterator[Dict]:
+        """Yield resource changes from plan JSON one at a time"""
+        for change in plan_json.get('resource_changes', ()):
+            resource_type = change.get('type', '')
+            resource_name = change.get('name', '')
+            actions = change.get('change', {}).get('actions', [])
+            
+            yield {
+                'resource': f"{resource_type}.{resource_name}",
+                'type': resource_type,
+                'name': resource_name,
+                'actions': actions,
+                'action_summary': ', '.join(actions)
+            }
     
     async def check_terraform_available(self) -> bool:
-        """Check if terraform binary is available"""
+        """Check if terraform binary is available (cached for an hour)"""
+        if self._avail and time.monotonic() - self._avail[2] < _AVAILABILITY_TTL:
+            return self._avail[0]
+        
         try:
             result = await self._run_terraform_command(['version'], '.')
-            return result.returncode == 0
+            available, version = result.returncode == 0, result.stdout.strip()
         except Exception:
-            return False
+            available, version = False, ''
+        
+        self._avail = (available, version, time.monotonic())
+        return available
+    
+    @property
+    def terraform_version(self) -> str:
+        """Version string from the last availability probe ('' if never probed)"""
+        return self._avail[1] if self._avail else ''
+    
+    def invalidate_availability(self):
+        """Forget the cached probe, e.g. after terraform is installed or upgraded"""
+        self._avail = None
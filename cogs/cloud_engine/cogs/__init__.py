@@ -4,3 +4,43 @@ Discord cogs for cloud provisioning commands
 
 # These will be loaded via bot.load_extension()
 # Example: await bot.load_extension('cloud_engine.cogs.user_commands')
+
+from ..core.orchestrator import CloudOrchestrator
+
+
+def get_shared_orchestrator(bot) -> CloudOrchestrator:
+    """
+    Return the CloudOrchestrator shared by all cloud cogs
+    
+    Created on first use and stored on the bot, so loading several cogs
+    doesn't split the session cache. Database access goes through the
+    cloud_database module's functions directly.
+    
+    Each cog that calls this must call release_shared_orchestrator() from
+    its cog_unload.
+    """
+    if getattr(bot, 'cloud_orchestrator', None) is None:
+        bot.cloud_orchestrator = CloudOrchestrator()
+        bot.cloud_orchestrator_users = 0
+    
+    bot.cloud_orchestrator_users += 1
+    return bot.cloud_orchestrator
+
+
+async def release_shared_orchestrator(bot):
+    """
+    Drop one cog's hold on the shared CloudOrchestrator
+    
+    The last cog to unload closes it (flushing the audit log and stopping
+    its background tasks), so a later load starts a fresh one.
+    """
+    orchestrator = getattr(bot, 'cloud_orchestrator', None)
+    if orchestrator is None:
+        return
+    
+    bot.cloud_orchestrator_users -= 1
+    if bot.cloud_orchestrator_users > 0:
+        return
+    
+    bot.cloud_orchestrator = None
+    await orchestrator.close()
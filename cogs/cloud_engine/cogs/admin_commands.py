@@ -8,13 +8,51 @@ These commands allow administrators to:
 - View all deployments
 """
 
+import asyncio
+import sqlite3
+import time
+
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Literal
+from typing import Literal, Optional, Tuple
+
+import cloud_database
+
+from . import get_shared_orchestrator, release_shared_orchestrator
+from ..models.session import CloudSession
+
+# Field body for one /cloud-admin-list row
+ADMIN_LIST_FIELD_TEMPLATE = (
+    "**User:** {user}\n"
+    "**Project:** {project}\n"
+    "**State:** {state}\n"
+    "**Resources:** {resources}\n"
+    "**Created:** <t:{created}:R>"
+)
 
-from ..core.orchestrator import CloudOrchestrator
-from cloud_database import CloudDatabase
+# /cloud-grant level -> user_cloud_permissions flags (anything unset stays 0)
+_DEPLOY_FLAGS = {
+    'can_create_vm': 1,
+    'can_create_db': 1,
+    'can_create_network': 1,
+    'can_create_storage': 1
+}
+PERMISSION_LEVELS = {
+    'read': {},
+    'deploy': _DEPLOY_FLAGS,
+    'admin': {**_DEPLOY_FLAGS, 'can_create_k8s': 1, 'can_delete': 1, 'can_modify': 1}
+}
+
+# Region a new project gets when /cloud-create-project isn't given one
+DEFAULT_REGIONS = {
+    'gcp': 'us-central1',
+    'aws': 'us-east-1',
+    'azure': 'eastus',
+}
+
+# How long /cloud-stats reuses its aggregate queries (seconds)
+STATS_CACHE_TTL = 30
 
 
 class AdminCommands(commands.Cog):
@@ -31,8 +69,10 @@ class AdminCommands(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = CloudDatabase()
-        self.orchestrator = CloudOrchestrator(self.db)
+        self.orchestrator = get_shared_orchestrator(bot)
+        
+        # (computed at, stats) for /cloud-stats
+        self._stats_cache: Optional[Tuple[float, dict]] = None
     
     def is_admin(interaction: discord.Interaction) -> bool:
         """
@@ -61,16 +101,21 @@ class AdminCommands(commands.Cog):
         """
         await interaction.response.defer(ephemeral=True)
         
-        # Grant permission
-        success = self.db.grant_permission(
-            user_id=user.id,
-            project_id=project,
-            permission=permission
+        # Grant permission (scoped to the project's provider in this server)
+        provider = await asyncio.to_thread(
+            self._grant_permission,
+            user.id,
+            interaction.guild_id,
+            project,
+            permission
         )
         
-        if success:
+        if provider:
+            self._invalidate_user_permissions(user.id)
+            
             await interaction.followup.send(
-                f"✅ Granted **{permission}** permission to {user.mention} for project `{project}`.",
+                f"✅ Granted **{permission}** permission to {user.mention} for project `{project}` "
+                f"(applies to {provider.upper()} deployments in this server).",
                 ephemeral=True
             )
             
@@ -106,12 +151,16 @@ class AdminCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Revoke permission
-        success = self.db.revoke_permission(
-            user_id=user.id,
-            project_id=project
+        success = await asyncio.to_thread(
+            self._revoke_permission,
+            user.id,
+            interaction.guild_id,
+            project
         )
         
         if success:
+            self._invalidate_user_permissions(user.id)
+            
             await interaction.followup.send(
                 f"✅ Revoked permissions for {user.mention} on project `{project}`.",
                 ephemeral=True
@@ -124,44 +173,42 @@ class AdminCommands(commands.Cog):
     
     @app_commands.command(name="cloud-create-project", description="📁 Create a new cloud project")
     @app_commands.describe(
-        project_id="Unique project identifier",
+        name="Project name",
         provider="Cloud provider",
-        description="Project description"
+        region="Default region (optional, defaults per provider)"
     )
     @app_commands.check(is_admin)
     async def cloud_create_project(
         self,
         interaction: discord.Interaction,
-        project_id: str,
+        name: str,
         provider: Literal["gcp", "aws", "azure"] = "gcp",
-        description: str = ""
+        region: str = None
     ):
         """
-        Create a new cloud project with default quotas
+        Create a new cloud project in this server with default quotas
+        
+        The invoking admin becomes the project owner; the project ID is
+        generated by the database.
         """
         await interaction.response.defer(ephemeral=True)
         
-        # Create project
-        success = self.db.create_cloud_project(
-            project_id=project_id,
-            provider=provider,
-            description=description
+        region = region or DEFAULT_REGIONS[provider]
+        
+        # Create project and its default quotas in one worker-thread hop
+        project_id = await asyncio.to_thread(
+            self._create_project_with_quotas,
+            interaction.guild_id,
+            interaction.user.id,
+            name,
+            provider,
+            region
         )
         
-        if success:
-            # Set default quotas
-            default_quotas = {
-                'compute_vm': 10,
-                'database': 5,
-                'vpc': 3,
-                'storage_bucket': 20
-            }
-            
-            for resource_type, limit in default_quotas.items():
-                self.db.set_quota(project_id, resource_type, limit)
-            
+        if project_id:
             await interaction.followup.send(
-                f"✅ Created cloud project `{project_id}` ({provider.upper()}).\n"
+                f"✅ Created cloud project **{name}** ({provider.upper()}, {region}).\n"
+                f"**Project ID:** `{project_id}`\n"
                 f"**Default Quotas:**\n"
                 f"- Compute VMs: 10\n"
                 f"- Databases: 5\n"
@@ -172,7 +219,7 @@ class AdminCommands(commands.Cog):
             )
         else:
             await interaction.followup.send(
-                f"❌ Failed to create project. Project ID may already exist.",
+                f"❌ Failed to create project.",
                 ephemeral=True
             )
     
@@ -196,7 +243,8 @@ class AdminCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Set quota
-        success = self.db.set_quota(
+        success = await asyncio.to_thread(
+            cloud_database.set_quota,
             project_id=project,
             resource_type=resource_type,
             limit=limit if limit >= 0 else None  # -1 = unlimited
@@ -217,14 +265,14 @@ class AdminCommands(commands.Cog):
     @app_commands.command(name="cloud-admin-list", description="📋 List all deployments (admin)")
     @app_commands.describe(
         project="Filter by project (optional)",
-        state="Filter by state (optional)"
+        state="Filter by deployment status (optional)"
     )
     @app_commands.check(is_admin)
     async def cloud_admin_list(
         self,
         interaction: discord.Interaction,
         project: str = None,
-        state: Literal["draft", "planning", "plan_ready", "applying", "applied", "failed"] = None
+        state: Literal["pending", "approved", "deploying", "completed", "failed", "cancelled", "expired"] = None
     ):
         """
         List all deployments across all users (admin view)
@@ -232,9 +280,11 @@ class AdminCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Get all sessions from database
-        sessions = self.db.get_all_deployment_sessions(
+        sessions = await asyncio.to_thread(
+            cloud_database.get_all_deployment_sessions,
             project_id=project,
-            state=state
+            state=state,
+            limit=15
         )
         
         if not sessions:
@@ -250,29 +300,29 @@ class AdminCommands(commands.Cog):
             color=discord.Color.purple()
         )
         
+        description_parts = []
         if project:
-            embed.description = f"**Project:** {project}"
-        
+            description_parts.append(f"**Project:** {project}")
         if state:
-            embed.description = f"{embed.description or ''}\n**State:** {state}"
+            description_parts.append(f"**Status:** {state}")
+        embed.description = "\n".join(description_parts) or None
         
-        for session_data in sessions[:15]:  # Limit to 15
-            from ..models.session import CloudSession
-            session = CloudSession.from_dict(session_data)
-            
-            user = self.bot.get_user(session.user_id)
-            user_name = user.name if user else f"User {session.user_id}"
+        shown = [CloudSession.from_dict(data) for data in sessions]
+        users = await self._resolve_users({session.owner_id for session in shown})
+        
+        for session in shown:
+            user = users.get(session.owner_id)
             
-            value = (
-                f"**User:** {user_name}\n"
-                f"**Project:** {session.project_id}\n"
-                f"**State:** {session.state.value.replace('_', ' ').title()}\n"
-                f"**Resources:** {len(session.resources)}\n"
-                f"**Created:** <t:{int(session.created_at.timestamp())}:R>"
+            value = ADMIN_LIST_FIELD_TEMPLATE.format(
+                user=user.name if user else f"User {session.owner_id}",
+                project=session.project_id,
+                state=session.state.value.replace('_', ' ').title(),
+                resources=len(session.resources),
+                created=int(session.created_at)
             )
             
             embed.add_field(
-                name=f"Session {session.id[:8]}",
+                name="Session " + session.id[:8],
                 value=value,
                 inline=False
             )
@@ -308,6 +358,8 @@ class AdminCommands(commands.Cog):
         success = await self.orchestrator.cancel_session(session_id)
         
         if success:
+            self._stats_cache = None  # Active session count changed
+            
             await interaction.followup.send(
                 f"✅ Admin cancelled deployment `{session_id}` for project `{session.project_id}`.",
                 ephemeral=True
@@ -326,8 +378,13 @@ class AdminCommands(commands.Cog):
         """
         await interaction.response.defer(ephemeral=True)
         
-        # Get statistics from database
-        stats = self.db.get_deployment_statistics()
+        # Get statistics (cached briefly; the aggregates scan whole tables)
+        now = time.monotonic()
+        if self._stats_cache and now - self._stats_cache[0] < STATS_CACHE_TTL:
+            stats = self._stats_cache[1]
+        else:
+            stats = await asyncio.to_thread(cloud_database.get_deployment_statistics)
+            self._stats_cache = (now, stats)
         
         # Build embed
         embed = discord.Embed(
@@ -387,6 +444,109 @@ class AdminCommands(commands.Cog):
             )
         
         await interaction.followup.send(embed=embed, ephemeral=True)
+    
+    async def _resolve_users(self, user_ids: set) -> dict:
+        """
+        Look up each distinct user once: cache hits first, then a single
+        concurrent batch of API fetches for the misses
+        """
+        users = {user_id: self.bot.get_user(user_id) for user_id in user_ids}
+        missing = [user_id for user_id, user in users.items() if user is None]
+        
+        if missing:
+            fetched = await asyncio.gather(
+                *(self.bot.fetch_user(user_id) for user_id in missing),
+                return_exceptions=True
+            )
+            for user_id, user in zip(missing, fetched):
+                if not isinstance(user, Exception):
+                    users[user_id] = user
+        
+        return users
+    
+    def _create_project_with_quotas(self, guild_id: int, owner_id: int, name: str,
+                                    provider: str, region: str) -> Optional[str]:
+        """
+        Create a project and its default quotas (blocking, run in a thread)
+        
+        Returns: The generated project ID, or None if the insert failed
+        """
+        try:
+            project_id = cloud_database.create_cloud_project(
+                str(guild_id),
+                str(owner_id),
+                provider,
+                name,
+                region
+            )
+        except sqlite3.Error as e:
+            print(f"❌ Failed to create cloud project {name}: {e}")
+            return None
+        
+        default_quotas = {
+            'compute_vm': 10,
+            'database': 5,
+            'vpc': 3,
+            'storage_bucket': 20
+        }
+        
+        # All four limits are written in a single transaction
+        cloud_database.set_quotas_bulk(project_id, default_quotas)
+        
+        return project_id
+    
+    def _grant_permission(self, user_id: int, guild_id: int, project_id: str, permission: str) -> Optional[str]:
+        """
+        Grant a permission level (blocking, run in a thread)
+        
+        Permissions are stored per user, server and provider, so access to
+        a project means access to its provider in the project's server.
+        
+        Returns: The provider granted, or None if the project isn't in this server
+        """
+        project = cloud_database.get_cloud_project(project_id)
+        
+        if project is None or project['guild_id'] != str(guild_id):
+            return None
+        
+        cloud_database.grant_user_permission(
+            str(user_id),
+            str(guild_id),
+            role_name=permission,
+            provider=project['provider'],
+            **PERMISSION_LEVELS[permission]
+        )
+        return project['provider']
+    
+    def _revoke_permission(self, user_id: int, guild_id: int, project_id: str) -> bool:
+        """
+        Revoke the permission _grant_permission gave for a project (blocking, run in a thread)
+        """
+        project = cloud_database.get_cloud_project(project_id)
+        
+        if project is None or project['guild_id'] != str(guild_id):
+            return False
+        
+        return cloud_database.revoke_user_permission(
+            str(user_id),
+            str(guild_id),
+            project['provider']
+        )
+    
+    async def cog_unload(self):
+        """
+        Release the shared orchestrator (closed once no cloud cog uses it)
+        """
+        await release_shared_orchestrator(self.bot)
+    
+    def _invalidate_user_permissions(self, user_id: int):
+        """
+        Drop permission checks UserCommands has cached for a user
+        """
+        user_cog = self.bot.get_cog('UserCommands')
+        
+        if user_cog is not None:
+            user_cog.invalidate_user(user_id)
 
 
 async def setup(bot: commands.Bot):
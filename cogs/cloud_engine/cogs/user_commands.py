@@ -5,14 +5,70 @@ These commands allow users to deploy infrastructure within their quotas.
 All business logic is delegated to CloudOrchestrator.
 """
 
+import asyncio
+import time
+
 import discord
 from discord import app_commands
 from discord.ext import commands
-from typing import Literal
+from typing import Dict, List, Literal, Tuple
+
+import cloud_database
+
+from . import get_shared_orchestrator, release_shared_orchestrator
+
+# Permission cache lifetimes (seconds). Denials expire sooner so a fresh
+# grant is picked up quickly even if invalidation is missed.
+PERMISSION_GRANT_TTL = 30
+PERMISSION_DENY_TTL = 10
+PROJECTS_CACHE_TTL = 30
+PERMISSION_CACHE_SIZE = 10_000
+
+# user_cloud_permissions flags that allow each action (any one is enough)
+ACTION_FLAGS = {
+    'deploy': ('can_create_vm', 'can_create_db', 'can_create_k8s',
+               'can_create_network', 'can_create_storage'),
+}
+
+# Sessions shown by /cloud-list (the limit is applied in the query)
+CLOUD_LIST_LIMIT = 10
+
+# /cloud-list icon per session state
+STATUS_EMOJI = {
+    'draft': '📝',
+    'planning': '⏳',
+    'plan_ready': '✅',
+    'applying': '🚀',
+    'applied': '✅',
+    'failed': '❌',
+    'cancelled': '🛑'
+}
+
+# /cloud-cancel reply per cancel_session_owned result
+CANCEL_MESSAGES = {
+    'ok': "✅ Deployment `{short_id}` cancelled.",
+    'not_found': "❌ Session not found or already expired.",
+    'forbidden': "❌ You can only cancel your own deployments.",
+    'bad_state': "❌ Failed to cancel deployment. It may already be applying or completed."
+}
+
+# Every default-length (10) progress bar, indexed by filled cells
+_PROGRESS_BARS = [f"[{'█' * i}{'░' * (10 - i)}]" for i in range(11)]
 
-from ..core.orchestrator import CloudOrchestrator
-from ..ui.lobby_view import DeploymentLobbyView
-from cloud_database import CloudDatabase
+# Display names for known states and resource types
+_PRETTY_NAMES = {
+    name: name.replace('_', ' ').title()
+    for name in (
+        'draft', 'planning', 'plan_ready', 'applying', 'applied', 'failed', 'cancelled',
+        'compute_vm', 'database', 'storage_bucket', 'vpc'
+    )
+}
+
+
+def _pretty(name: str) -> str:
+    """snake_case -> Title Case, precomputed for the common names"""
+    pretty = _PRETTY_NAMES.get(name)
+    return pretty if pretty is not None else name.replace('_', ' ').title()
 
 
 class UserCommands(commands.Cog):
@@ -28,8 +84,12 @@ class UserCommands(commands.Cog):
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = CloudDatabase()
-        self.orchestrator = CloudOrchestrator(self.db)
+        self.orchestrator = get_shared_orchestrator(bot)
+        
+        # (user_id, project, action) -> (expires at, allowed)
+        self._permission_cache: Dict[Tuple[int, str, str], Tuple[float, bool]] = {}
+        # (user_id, guild_id) -> (expires at, projects)
+        self._projects_cache: Dict[Tuple[int, int], Tuple[float, List[Dict]]] = {}
     
     @app_commands.command(name="cloud-deploy", description="🚀 Deploy cloud infrastructure")
     @app_commands.describe(
@@ -53,10 +113,11 @@ class UserCommands(commands.Cog):
         """
         await interaction.response.defer()
         
-        # Check if user has access to project
-        has_access = self.db.check_user_permission(
+        # Check if user has access to project (off the event loop)
+        has_access = await self._check_permission(
             interaction.user.id,
-            project,
+            interaction.guild_id,
+            provider.lower(),
             'deploy'
         )
         
@@ -76,7 +137,8 @@ class UserCommands(commands.Cog):
             ttl_minutes=30
         )
         
-        # Create deployment lobby view
+        # Create deployment lobby view (the UI package is only needed here)
+        from ..ui.lobby_view import DeploymentLobbyView
         view = DeploymentLobbyView(
             session=session,
             orchestrator=self.orchestrator
@@ -109,9 +171,11 @@ class UserCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Get user sessions
-        sessions = self.orchestrator.get_user_sessions(
+        sessions = await asyncio.to_thread(
+            self.orchestrator.get_user_sessions,
             interaction.user.id,
-            include_expired=include_expired
+            include_expired=include_expired,
+            limit=CLOUD_LIST_LIMIT
         )
         
         if not sessions:
@@ -121,37 +185,30 @@ class UserCommands(commands.Cog):
             )
             return
         
-        # Build embed
-        embed = discord.Embed(
-            title=f"☁️ Your Cloud Deployments ({len(sessions)})",
-            color=discord.Color.blue()
-        )
+        # Build embed fields, then the embed in one pass
+        fields = []
         
-        for session in sessions[:10]:  # Limit to 10
-            status_emoji = {
-                'draft': '📝',
-                'planning': '⏳',
-                'plan_ready': '✅',
-                'applying': '🚀',
-                'applied': '✅',
-                'failed': '❌',
-                'cancelled': '🛑'
-            }
-            
-            emoji = status_emoji.get(session.state.value, '❓')
+        for session in sessions:
+            emoji = STATUS_EMOJI.get(session.state.value, '❓')
             
             value = (
-                f"**State:** {emoji} {session.state.value.replace('_', ' ').title()}\n"
+                f"**State:** {emoji} {_pretty(session.state.value)}\n"
                 f"**Provider:** {session.provider.upper()}\n"
                 f"**Resources:** {len(session.resources)}\n"
-                f"**Expires:** <t:{int(session.expires_at.timestamp())}:R>"
+                f"**Expires:** <t:{int(session.expires_at)}:R>"
             )
             
-            embed.add_field(
-                name=f"{session.project_id} ({session.id[:8]})",
-                value=value,
-                inline=False
-            )
+            fields.append({
+                'name': f"{session.project_id} ({session.id[:8]})",
+                'value': value,
+                'inline': False
+            })
+        
+        embed = discord.Embed.from_dict({
+            'title': f"☁️ Your Cloud Deployments ({len(sessions)})",
+            'color': discord.Color.blue().value,
+            'fields': fields
+        })
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
@@ -170,7 +227,7 @@ class UserCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Get quota info
-        quota_info = self.orchestrator.get_project_quota(project)
+        quota_info = await asyncio.to_thread(self.orchestrator.get_project_quota, project)
         
         if not quota_info:
             await interaction.followup.send(
@@ -179,13 +236,9 @@ class UserCommands(commands.Cog):
             )
             return
         
-        # Build embed
-        embed = discord.Embed(
-            title=f"📊 Quotas for {project}",
-            color=discord.Color.gold()
-        )
+        # Build quota fields, then the embed in one pass
+        fields = []
         
-        # Add quota fields
         for resource_type, quota in quota_info.items():
             limit = quota.get('limit', 'unlimited')
             used = quota.get('used', 0)
@@ -197,11 +250,17 @@ class UserCommands(commands.Cog):
                 bar = self._create_progress_bar(percentage)
                 value = f"{bar} {used}/{limit} ({percentage:.0f}%)"
             
-            embed.add_field(
-                name=resource_type.replace('_', ' ').title(),
-                value=value,
-                inline=False
-            )
+            fields.append({
+                'name': _pretty(resource_type),
+                'value': value,
+                'inline': False
+            })
+        
+        embed = discord.Embed.from_dict({
+            'title': f"📊 Quotas for {project}",
+            'color': discord.Color.gold().value,
+            'fields': fields
+        })
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
@@ -213,7 +272,7 @@ class UserCommands(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         # Get projects from database
-        projects = self.db.list_user_projects(interaction.user.id)
+        projects = await self._list_user_projects(interaction.user.id, interaction.guild_id)
         
         if not projects:
             await interaction.followup.send(
@@ -223,28 +282,31 @@ class UserCommands(commands.Cog):
             )
             return
         
-        # Build embed
-        embed = discord.Embed(
-            title="📁 Your Cloud Projects",
-            description=f"You have access to {len(projects)} project(s)",
-            color=discord.Color.blue()
-        )
+        # Build embed fields, then the embed in one pass
+        fields = []
         
         for project in projects:
             project_id = project['project_id']
             provider = project.get('provider', 'gcp')
-            permissions = project.get('permissions', [])
             
             value = (
+                f"**Name:** {project.get('project_name', project_id)}\n"
                 f"**Provider:** {provider.upper()}\n"
-                f"**Permissions:** {', '.join(permissions)}"
+                f"**Region:** {project.get('region', 'unknown')}"
             )
             
-            embed.add_field(
-                name=project_id,
-                value=value,
-                inline=False
-            )
+            fields.append({
+                'name': project_id,
+                'value': value,
+                'inline': False
+            })
+        
+        embed = discord.Embed.from_dict({
+            'title': "📁 Your Cloud Projects",
+            'description': f"You have access to {len(projects)} project(s)",
+            'color': discord.Color.blue().value,
+            'fields': fields
+        })
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
@@ -262,37 +324,16 @@ class UserCommands(commands.Cog):
         """
         await interaction.response.defer(ephemeral=True)
         
-        # Get session
-        session = self.orchestrator.get_session(session_id)
-        
-        if not session:
-            await interaction.followup.send(
-                "❌ Session not found or already expired.",
-                ephemeral=True
-            )
-            return
-        
-        # Check if user owns the session
-        if session.user_id != interaction.user.id:
-            await interaction.followup.send(
-                "❌ You can only cancel your own deployments.",
-                ephemeral=True
-            )
-            return
-        
-        # Cancel session
-        success = await self.orchestrator.cancel_session(session_id)
+        # Ownership, state and cancel are checked in one orchestrator call
+        result = await self.orchestrator.cancel_session_owned(
+            session_id,
+            interaction.user.id
+        )
         
-        if success:
-            await interaction.followup.send(
-                f"✅ Deployment `{session_id[:8]}` cancelled.",
-                ephemeral=True
-            )
-        else:
-            await interaction.followup.send(
-                "❌ Failed to cancel deployment. It may already be applying or completed.",
-                ephemeral=True
-            )
+        await interaction.followup.send(
+            CANCEL_MESSAGES[result].format(short_id=session_id[:8]),
+            ephemeral=True
+        )
     
     def _create_progress_bar(self, percentage: float, length: int = 10) -> str:
         """
@@ -301,9 +342,82 @@ class UserCommands(commands.Cog):
         Example: [████████░░] 80%
         """
         filled = int((percentage / 100) * length)
+        
+        if length == 10 and 0 <= filled <= 10:
+            return _PROGRESS_BARS[filled]
+        
         empty = length - filled
         
         return f"[{'█' * filled}{'░' * empty}]"
+    
+    async def _check_permission(self, user_id: int, guild_id: int, provider: str, action: str) -> bool:
+        """
+        Cached cloud_database.get_user_permissions check for one action
+        
+        Permissions are granted per user, server and provider, so the cache
+        is keyed the same way. Grants are kept for PERMISSION_GRANT_TTL,
+        denials for PERMISSION_DENY_TTL.
+        """
+        key = (user_id, guild_id, provider, action)
+        now = time.monotonic()
+        
+        cached = self._permission_cache.pop(key, None)
+        if cached and cached[0] > now:
+            self._permission_cache[key] = cached  # Re-insert as most recent
+            return cached[1]
+        
+        perms = await asyncio.to_thread(
+            cloud_database.get_user_permissions, str(user_id), str(guild_id), provider
+        )
+        allowed = bool(perms) and any(perms.get(flag) for flag in ACTION_FLAGS.get(action, ()))
+        
+        if len(self._permission_cache) >= PERMISSION_CACHE_SIZE:
+            self._permission_cache.pop(next(iter(self._permission_cache)))
+        
+        ttl = PERMISSION_GRANT_TTL if allowed else PERMISSION_DENY_TTL
+        self._permission_cache[key] = (now + ttl, allowed)
+        
+        return allowed
+    
+    async def _list_user_projects(self, user_id: int, guild_id: int) -> List[Dict]:
+        """
+        Cached cloud_database.list_user_projects (projects the user owns in this server)
+        """
+        key = (user_id, guild_id)
+        now = time.monotonic()
+        
+        cached = self._projects_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        projects = await asyncio.to_thread(
+            cloud_database.list_user_projects, str(user_id), str(guild_id)
+        )
+        
+        if len(self._projects_cache) >= PERMISSION_CACHE_SIZE:
+            self._projects_cache.pop(next(iter(self._projects_cache)))
+        
+        self._projects_cache[key] = (now + PROJECTS_CACHE_TTL, projects)
+        
+        return projects
+    
+    async def cog_unload(self):
+        """
+        Release the shared orchestrator (closed once no cloud cog uses it)
+        """
+        await release_shared_orchestrator(self.bot)
+    
+    def invalidate_user(self, user_id: int):
+        """
+        Forget cached permissions and projects for a user
+        
+        Called by AdminCommands when a grant or revoke changes access.
+        """
+        for key in [k for k in self._projects_cache if k[0] == user_id]:
+            del self._projects_cache[key]
+        
+        for key in [k for k in self._permission_cache if k[0] == user_id]:
+            del self._permission_cache[key]
 
 
 async def setup(bot: commands.Bot):
@@ -5,30 +5,35 @@ Integrates with cloud provider pricing APIs for accurate cost estimates.
 Falls back to local pricing data when APIs are unavailable.
 """
 
-from typing import Dict, Optional, Literal
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Literal, Tuple
+from dataclasses import dataclass, field
+import functools
 import json
+import sys
 
 
-@dataclass
+# Average hours in a month used for all monthly figures
+HOURS_PER_MONTH = 730
+
+# Recommendation templates, filled with str.format
+CHEAPER_ALTERNATIVE_TEMPLATE = "💡 Consider {} to save ${:.2f}/month (~{:.0f}%)"
+RESERVED_INSTANCE_TEMPLATE = "💰 Use reserved instances to save ~${:.2f}/month"
+READ_REPLICA_RECOMMENDATION = "📊 Consider read replicas for better performance at scale"
+
+
+@dataclass(slots=True)
 class CostEstimate:
     """Cost estimate for a resource"""
     hourly_cost: float
     monthly_cost: float
     currency: str = "USD"
-    breakdown: Dict[str, float] = None
-    recommendations: list = None
+    breakdown: Dict[str, float] = field(default_factory=dict)
+    recommendations: List[str] = field(default_factory=list)
+    yearly_cost: float = field(init=False, repr=False)
     
-    def __post_init__(self):
-        if self.breakdown is None:
-            self.breakdown = {}
-        if self.recommendations is None:
-            self.recommendations = []
-    
-    @property
-    def yearly_cost(self) -> float:
-        """Calculate yearly cost"""
-        return self.monthly_cost * 12
+    def __post_init__(self) -> None:
+        # Computed once; estimates aren't modified after construction
+        self.yearly_cost = self.monthly_cost * 12
 
 
 class CostEstimator:
@@ -151,25 +156,15 @@ class CostEstimator:
         Returns:
             CostEstimate with hourly and monthly costs
         """
-        machine_type = config.get('machine_type', config.get('size', ''))
-        
-        # Get base hourly cost
-        hourly = cls.PRICING_DATA.get(provider, {}).get(resource_type, {}).get(machine_type, 0.0)
-        
-        breakdown = {'compute': hourly}
+        machine_type, compute_hourly, disk_hourly, monthly = cls._rates(
+            provider, resource_type, config
+        )
+        hourly = compute_hourly + disk_hourly
         
-        # Add disk costs if applicable
+        breakdown = {'compute': compute_hourly}
         if resource_type == 'compute_vm':
-            disk_size = config.get('disk_size_gb', 10)
-            disk_type = config.get('disk_type', 'standard')
-            
-            disk_hourly = (cls.DISK_PRICING.get(provider, {}).get(disk_type, 0.04) * disk_size) / 730
-            hourly += disk_hourly
             breakdown['disk'] = disk_hourly
         
-        # Calculate monthly (730 hours average)
-        monthly = hourly * 730
-        
         # Generate recommendations
         recommendations = cls._generate_recommendations(
             provider, resource_type, machine_type, monthly
@@ -182,47 +177,90 @@ class CostEstimator:
             recommendations=recommendations
         )
     
+    @staticmethod
+    def _rates(
+        provider: str,
+        resource_type: str,
+        config: Dict
+    ) -> Tuple[str, float, float, float]:
+        """
+        Look up the raw rates for a single resource
+        
+        Returns: (machine_type, compute_hourly, disk_hourly, monthly_total)
+        """
+        machine_type = config.get('machine_type', config.get('size', ''))
+        
+        # Get base hourly and monthly cost (precomputed at import)
+        hourly, monthly = _FLAT_PRICING.get((provider, resource_type, machine_type), (0.0, 0.0))
+        disk_hourly = 0.0
+        
+        # Add disk costs if applicable
+        if resource_type == 'compute_vm':
+            disk_size = config.get('disk_size_gb', 10)
+            disk_type = config.get('disk_type', 'standard')
+            
+            disk_hourly = _DISK_MONTHLY.get((provider, disk_type), 0.04) * disk_size / HOURS_PER_MONTH
+            # Same float order as hourly_cost * HOURS_PER_MONTH, so the
+            # monthly figure matches the hourly one to the cent
+            monthly = (hourly + disk_hourly) * HOURS_PER_MONTH
+        
+        return machine_type, hourly, disk_hourly, monthly
+    
     @classmethod
     def estimate_deployment(
         cls,
         provider: str,
-        resources: list
+        resources: Iterable[Dict],
+        detailed: bool = True
     ) -> CostEstimate:
         """
         Estimate total cost for multiple resources
         
         Args:
             provider: Cloud provider
-            resources: List of resource configs
+            resources: Resource configs (any iterable, consumed once)
+            detailed: Include per-resource breakdown and recommendations.
+                When False only the totals are computed, without building
+                a CostEstimate per resource.
         
         Returns:
             CostEstimate with total costs and breakdown
         """
         total_hourly = 0.0
-        breakdown = {}
-        all_recommendations = []
+        
+        breakdown: Dict[str, float] = {}
+        recommendations: List[str] = []
+        rates = cls._rates
         
         for resource in resources:
-            estimate = cls.estimate_resource(
-                provider,
-                resource.get('type', 'compute_vm'),
-                resource.get('config', {})
+            resource_type = resource.get('type', 'compute_vm')
+            config = resource.get('config', {})
+            
+            machine_type, compute_hourly, disk_hourly, monthly = rates(
+                provider, resource_type, config
             )
+            hourly = compute_hourly + disk_hourly
             
-            total_hourly += estimate.hourly_cost
+            total_hourly += hourly
+            
+            if not detailed:
+                continue
             
             # Add to breakdown
-            resource_name = resource.get('config', {}).get('name', 'unnamed')
-            breakdown[resource_name] = estimate.hourly_cost
+            breakdown[config.get('name', 'unnamed')] = hourly
             
-            # Collect recommendations
-            all_recommendations.extend(estimate.recommendations)
+            # Collect recommendations; only the first 5 are kept, so stop
+            # generating them once that many are collected
+            if len(recommendations) < 5:
+                recommendations.extend(cls._cached_recommendations(
+                    provider, resource_type, machine_type, monthly
+                ))
         
         return CostEstimate(
             hourly_cost=total_hourly,
-            monthly_cost=total_hourly * 730,
+            monthly_cost=total_hourly * HOURS_PER_MONTH,
             breakdown=breakdown,
-            recommendations=all_recommendations[:5]  # Top 5 recommendations
+            recommendations=recommendations[:5]  # Top 5 recommendations
         )
     
     @classmethod
@@ -232,45 +270,55 @@ class CostEstimator:
         resource_type: str,
         machine_type: str,
         monthly_cost: float
-    ) -> list:
+    ) -> List[str]:
         """
         Generate cost optimization recommendations
         
         Returns list of recommendation strings
         """
-        recommendations = []
+        return list(cls._cached_recommendations(provider, resource_type, machine_type, monthly_cost))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _cached_recommendations(
+        provider: str,
+        resource_type: str,
+        machine_type: str,
+        monthly_cost: float
+    ) -> Tuple[str, ...]:
+        """
+        Memoized body of _generate_recommendations
+        
+        Returns a tuple so the cached value can't be mutated by callers.
+        """
+        recommendations: List[str] = []
         
         if resource_type == 'compute_vm':
             # Find cheaper alternatives
-            cheaper = cls._find_cheaper_alternative(provider, resource_type, machine_type)
+            cheaper = CostEstimator._find_cheaper_alternative(provider, resource_type, machine_type)
             
             if cheaper:
                 savings = monthly_cost - cheaper['cost']
                 savings_pct = (savings / monthly_cost) * 100
                 
                 recommendations.append(
-                    f"💡 Consider {cheaper['type']} to save ${savings:.2f}/month (~{savings_pct:.0f}%)"
+                    CHEAPER_ALTERNATIVE_TEMPLATE.format(cheaper['type'], savings, savings_pct)
                 )
             
             # Suggest reserved instances for long-running VMs
             if monthly_cost > 50:
                 reserved_savings = monthly_cost * 0.3  # ~30% savings
-                recommendations.append(
-                    f"💰 Use reserved instances to save ~${reserved_savings:.2f}/month"
-                )
+                recommendations.append(RESERVED_INSTANCE_TEMPLATE.format(reserved_savings))
         
         elif resource_type == 'database':
             # Suggest read replicas for high-traffic databases
             if monthly_cost > 100:
-                recommendations.append(
-                    "📊 Consider read replicas for better performance at scale"
-                )
+                recommendations.append(READ_REPLICA_RECOMMENDATION)
         
-        return recommendations
+        return tuple(recommendations)
     
-    @classmethod
+    @staticmethod
     def _find_cheaper_alternative(
-        cls,
         provider: str,
         resource_type: str,
         current_type: str
@@ -278,22 +326,37 @@ class CostEstimator:
         """
         Find a cheaper machine type with similar specs
         
+        Pricing is static, so every answer is precomputed at import.
+        The returned dict is shared between callers and must not be mutated.
+        
         Returns: Dict with 'type' and 'cost' or None
         """
-        pricing = cls.PRICING_DATA.get(provider, {}).get(resource_type, {})
+        return _CHEAPER_ALTERNATIVES.get((provider, resource_type, current_type))
+    
+    @staticmethod
+    def _search_cheaper_alternative(
+        provider: str,
+        resource_type: str,
+        current_type: str
+    ) -> Optional[Dict]:
+        """
+        Scan the pricing table for a cheaper alternative (used at import)
+        """
+        current = _FLAT_PRICING.get((provider, resource_type, current_type))
         
-        if current_type not in pricing:
+        if current is None:
             return None
         
-        current_cost = pricing[current_type] * 730
+        current_cost = current[1]
         
         # Find types with 70-90% of current cost
-        cheaper_types = []
+        cheaper_types: List[Dict] = []
         
-        for machine_type, hourly_cost in pricing.items():
-            monthly = hourly_cost * 730
+        for machine_type, monthly in _MONTHLY_BY_TYPE.get((provider, resource_type), ()):
+            if monthly >= 0.9 * current_cost:
+                break  # Sorted by cost, nothing further qualifies
             
-            if 0.5 * current_cost <= monthly < 0.9 * current_cost:
+            if 0.5 * current_cost <= monthly:
                 cheaper_types.append({
                     'type': machine_type,
                     'cost': monthly
@@ -324,3 +387,61 @@ class CostEstimator:
             'remaining': max(0, budget_limit - estimated_cost),
             'overage': max(0, estimated_cost - budget_limit)
         }
+
+
+def _build_flat_pricing() -> Tuple[
+    Dict[Tuple[str, str, str], Tuple[float, float]],
+    Dict[Tuple[str, str], List[Tuple[str, float]]],
+    Dict[Tuple[str, str], float]
+]:
+    """
+    Flatten the pricing tables into O(1) lookups
+    
+    Run once at import so estimates don't walk nested dicts or
+    multiply by HOURS_PER_MONTH on every call. Key strings are interned
+    so tuple hashing/comparison against literal keys short-circuits.
+    """
+    intern = sys.intern
+    flat: Dict[Tuple[str, str, str], Tuple[float, float]] = {}
+    by_type: Dict[Tuple[str, str], List[Tuple[str, float]]] = {}
+    
+    for provider, resource_types in CostEstimator.PRICING_DATA.items():
+        provider = intern(provider)
+        for resource_type, machine_types in resource_types.items():
+            resource_type = intern(resource_type)
+            entries: List[Tuple[str, float]] = []
+            for machine_type, hourly in machine_types.items():
+                machine_type = intern(machine_type)
+                monthly = hourly * HOURS_PER_MONTH
+                flat[(provider, resource_type, machine_type)] = (hourly, monthly)
+                entries.append((machine_type, monthly))
+            
+            by_type[(provider, resource_type)] = sorted(entries, key=lambda e: e[1])
+    
+    disk = {
+        (intern(provider), intern(disk_type)): price
+        for provider, disk_types in CostEstimator.DISK_PRICING.items()
+        for disk_type, price in disk_types.items()
+    }
+    
+    return flat, by_type, disk
+
+
+_FLAT_PRICING, _MONTHLY_BY_TYPE, _DISK_MONTHLY = _build_flat_pricing()
+
+
+def _build_cheaper_alternatives() -> Dict[Tuple[str, str, str], Dict]:
+    """
+    Precompute the cheaper alternative for every priced machine type
+    """
+    alternatives: Dict[Tuple[str, str, str], Dict] = {}
+    
+    for key in _FLAT_PRICING:
+        cheaper = CostEstimator._search_cheaper_alternative(*key)
+        if cheaper is not None:
+            alternatives[key] = cheaper
+    
+    return alternatives
+
+
+_CHEAPER_ALTERNATIVES = _build_cheaper_alternatives()
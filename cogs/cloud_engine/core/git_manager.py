@@ -6,9 +6,140 @@ Automatically commits and tracks infrastructure changes.
 
 import subprocess
 import asyncio
+import codecs
+import configparser
+import os
 from pathlib import Path
-from typing import Optional, Dict
-from datetime import datetime
+from typing import AsyncIterator, Optional, Dict
+
+
+# Above this many paths `git add` reads them from stdin instead of argv
+_MAX_ADD_ARGS = 1000
+
+# get_commit_history: fields split by 0x1f, commits by NUL (git log -z)
+_LOG_FORMAT = '--pretty=format:%H%x1f%an%x1f%ae%x1f%ai%x1f%s'
+_COMMIT_KEYS = ('hash', 'author', 'email', 'date', 'message')
+
+# .gitignore written into every new project repo
+_GITIGNORE = """
+# Terraform
+.terraform/
+*.tfstate
+*.tfstate.*
+*.tfvars
+.terraform.lock.hcl
+
+# Sensitive
+*.pem
+*.key
+secrets.auto.tfvars
+
+# OS
+.DS_Store
+Thumbs.db
+"""
+
+# Read size for streamed git output
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Parent environment variables git still needs (identity, config, ssh,
+# proxies). EMAIL/USER/LOGNAME are git's identity fallbacks when user.*
+# isn't configured, and TZ sets the timezone recorded on commits.
+_GIT_ENV_KEYS = frozenset((
+    'PATH', 'HOME', 'XDG_CONFIG_HOME', 'TMPDIR',
+    'EMAIL', 'USER', 'LOGNAME', 'TZ', 'LANG',
+    'HTTPS_PROXY', 'HTTP_PROXY', 'NO_PROXY', 'https_proxy', 'http_proxy', 'no_proxy'
+))
+_GIT_ENV_PREFIXES = ('GIT_', 'SSH_')
+
+
+def _git_env() -> Dict[str, str]:
+    """
+    Minimal environment for git subprocesses
+    
+    Children otherwise copy the bot's whole environment on every spawn.
+    Prompts are disabled (a push can't hang waiting on a terminal),
+    optional index locks are skipped and output is not localized.
+    """
+    env = {
+        key: value for key, value in os.environ.items()
+        if key in _GIT_ENV_KEYS or key.startswith(_GIT_ENV_PREFIXES)
+    }
+    env.update(
+        GIT_TERMINAL_PROMPT='0',
+        GIT_OPTIONAL_LOCKS='0',
+        LC_ALL='C'
+    )
+    return env
+
+
+def _parse_commit_record(record: bytes) -> Optional[Dict]:
+    """Turn one git log -z record into a commit dict (None if malformed)"""
+    parts = record.decode('utf-8', errors='replace').split('\x1f', 4)
+    
+    if len(parts) == 5:
+        return dict(zip(_COMMIT_KEYS, parts))
+    
+    return None
+
+
+class _CatFileBatch:
+    """
+    Long-lived `git cat-file --batch-check` process for one repository
+    
+    Resolves refs to object IDs over a pipe instead of spawning a new
+    `git rev-parse` for every lookup. Refs are re-read on each request,
+    so new commits are seen immediately.
+    """
+    
+    def __init__(self, repo_dir: Path, env: Optional[Dict[str, str]] = None):
+        self.repo_dir = repo_dir
+        self._env = env
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+    
+    async def resolve(self, ref: str) -> str:
+        """
+        Resolve a ref (e.g. HEAD) to its full object ID
+        
+        Raises:
+            Exception: If the ref doesn't exist or git isn't available
+        """
+        async with self._lock:
+            if self._process is None or self._process.returncode is not None:
+                try:
+                    self._process = await asyncio.create_subprocess_exec(
+                        'git', 'cat-file', '--batch-check',
+                        cwd=str(self.repo_dir),
+                        env=self._env,
+                        stdin=asyncio.subprocess.PIPE,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.DEVNULL
+                    )
+                except FileNotFoundError:
+                    raise Exception("Git not installed. Please install git.")
+            
+            try:
+                self._process.stdin.write(ref.encode() + b'\n')
+                await self._process.stdin.drain()
+                line = await self._process.stdout.readline()
+            except (BrokenPipeError, ConnectionResetError):
+                line = b''
+        
+        # "<oid> <type> <size>" on success, "<ref> missing" otherwise
+        parts = line.split()
+        
+        if len(parts) != 3:
+            raise Exception(f"Git command failed: cannot resolve {ref}")
+        
+        return parts[0].decode()
+    
+    async def close(self):
+        """Stop the background process (it exits when stdin closes)"""
+        if self._process is not None and self._process.returncode is None:
+            self._process.stdin.close()
+            await self._process.wait()
+        self._process = None
 
 
 class GitManager:
@@ -22,9 +153,36 @@ class GitManager:
     - Push to remote (optional)
     """
     
-    def __init__(self, base_dir: str = "terraform_runs"):
+    def __init__(self, base_dir: str = "terraform_runs", max_concurrent_git: int = None):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Caps git subprocesses across all projects
+        self.process_semaphore = asyncio.Semaphore(
+            max_concurrent_git or min(8, os.cpu_count() or 4)
+        )
+        
+        # Environment for every git child, built once
+        self._git_env = _git_env()
+        
+        # project_id -> repo Path; a reused Path also caches its str() for cwd=
+        self._repo_dirs: Dict[str, Path] = {}
+        
+        # One persistent ref resolver per repository
+        self._cat_file: Dict[Path, _CatFileBatch] = {}
+        
+        # Per-project locks so writes never race on .git/index.lock
+        self._repo_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Projects whose repo directory already exists
+        self._created_dirs: set = set()
+        
+        # Projects with an initialized repo; repopulated by one .git stat
+        # per project after a restart
+        self._initialized: set = set()
+        
+        # project_id -> ((mtime_ns, size) of .git/config, has origin remote)
+        self._remote_cache: Dict[str, tuple] = {}
     
     async def init_repo(self, project_id: str) -> bool:
         """
@@ -36,44 +194,47 @@ class GitManager:
         Returns:
             True if successful
         """
-        repo_dir = self.base_dir / project_id
-        repo_dir.mkdir(parents=True, exist_ok=True)
+        if project_id in self._initialized:
+            return True
+        
+        async with self._lock_for(project_id):
+            return await self._init_repo(project_id)
+    
+    async def _init_repo(self, project_id: str) -> bool:
+        """
+        init_repo body; the caller must hold the project's repo lock
+        """
+        if project_id in self._initialized:
+            return True
+        
+        repo_dir = self._repo_dir(project_id)
+        
+        # Only the first call per project needs the mkdir syscall
+        if project_id not in self._created_dirs:
+            repo_dir.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(project_id)
         
         # Check if already initialized
         if (repo_dir / '.git').exists():
+            self._initialized.add(project_id)
             return True
         
         try:
             # Initialize repo
-            await self._run_git_command(['init'], cwd=repo_dir)
+            await self._run_git_command(['init'], cwd=repo_dir, capture=False)
             
             # Create .gitignore
             gitignore = repo_dir / '.gitignore'
-            gitignore.write_text("""
-# Terraform
-.terraform/
-*.tfstate
-*.tfstate.*
-*.tfvars
-.terraform.lock.hcl
-
-# Sensitive
-*.pem
-*.key
-secrets.auto.tfvars
-
-# OS
-.DS_Store
-Thumbs.db
-""")
+            await asyncio.to_thread(gitignore.write_text, _GITIGNORE)
             
             # Initial commit
-            await self._run_git_command(['add', '.gitignore'], cwd=repo_dir)
+            await self._run_git_command(['add', '.gitignore'], cwd=repo_dir, capture=False)
             await self._run_git_command(
                 ['commit', '-m', 'Initial commit'],
                 cwd=repo_dir
             )
             
+            self._initialized.add(project_id)
             return True
         
         except Exception as e:
@@ -94,50 +255,58 @@ Thumbs.db
             project_id: Project identifier
             user_id: User who made changes
             message: Commit message
-            files: Specific files to commit (None = all)
+            files: Specific files to commit. None commits changes to
+                already-tracked files only (git commit -a, no worktree
+                scan); new files must be passed here explicitly
         
         Returns:
             Dict with success, commit_hash, message
         """
-        repo_dir = self.base_dir / project_id
-        
-        # Ensure repo exists
-        if not (repo_dir / '.git').exists():
-            await self.init_repo(project_id)
+        repo_dir = self._repo_dir(project_id)
         
-        try:
-            # Add files
-            if files:
-                for file in files:
-                    await self._run_git_command(['add', file], cwd=repo_dir)
-            else:
-                await self._run_git_command(['add', '.'], cwd=repo_dir)
+        async with self._lock_for(project_id):
+            # Ensure repo exists (no-op once the project is known)
+            await self._init_repo(project_id)
             
-            # Commit with user context
-            commit_msg = f"{message}\n\nDeployed-By: User-{user_id}\nTimestamp: {datetime.utcnow().isoformat()}"
-            
-            result = await self._run_git_command(
-                ['commit', '-m', commit_msg],
-                cwd=repo_dir
-            )
-            
-            # Get commit hash
-            commit_hash = await self._run_git_command(
-                ['rev-parse', 'HEAD'],
-                cwd=repo_dir
-            )
+            try:
+                # Add files (one git process for all paths); with no files,
+                # tracked changes are staged by commit -a below instead of
+                # walking the whole worktree with add .
+                if files and len(files) > _MAX_ADD_ARGS:
+                    await self._run_git_command(
+                        ['add', '--pathspec-from-file=-', '--pathspec-file-nul'],
+                        cwd=repo_dir,
+                        stdin_data='\0'.join(map(str, files)).encode(),
+                        capture=False
+                    )
+                elif files:
+                    await self._run_git_command(['add', '--', *files], cwd=repo_dir, capture=False)
+                
+                # Commit with user context (the time is git's own commit
+                # date, shown as 'date' by get_commit_history)
+                commit_msg = f"{message}\n\nDeployed-By: User-{user_id}"
+                
+                # -q: the summary is never read; the hash comes from the
+                # persistent cat-file process, not another git fork
+                await self._run_git_command(
+                    ['commit', '-q', *(() if files else ('-a',)), '-m', commit_msg],
+                    cwd=repo_dir
+                )
+                
+                # Get commit hash
+                commit_hash = await self._resolve_ref(repo_dir, 'HEAD')
+                
+                return {
+                    'success': True,
+                    'commit_hash': commit_hash,
+                    'message': message
+                }
             
-            return {
-                'success': True,
-                'commit_hash': commit_hash.strip(),
-                'message': message
-            }
-        
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            except Exception as e:
+                return {
+                    'success': False,
+                    'error': str(e)
+                }
     
     async def tag_release(
         self,
@@ -156,16 +325,17 @@ Thumbs.db
         Returns:
             True if successful
         """
-        repo_dir = self.base_dir / project_id
+        repo_dir = self._repo_dir(project_id)
         
-        try:
-            await self._run_git_command(
-                ['tag', '-a', tag_name, '-m', message or tag_name],
-                cwd=repo_dir
-            )
-            return True
-        except Exception:
-            return False
+        async with self._lock_for(project_id):
+            try:
+                await self._run_git_command_sync(
+                    ['tag', '-a', tag_name, '-m', message or tag_name],
+                    cwd=repo_dir
+                )
+                return True
+            except Exception:
+                return False
     
     async def get_commit_history(
         self,
@@ -182,38 +352,53 @@ Thumbs.db
         Returns:
             List of commit dicts
         """
-        repo_dir = self.base_dir / project_id
-        
-        if not (repo_dir / '.git').exists():
-            return []
-        
         try:
-            # Get log in JSON-like format
-            output = await self._run_git_command(
-                ['log', f'-{limit}', '--pretty=format:%H|%an|%ae|%ai|%s'],
-                cwd=repo_dir
-            )
-            
-            commits = []
-            for line in output.strip().split('\n'):
-                if not line:
-                    continue
-                
-                parts = line.split('|')
-                if len(parts) == 5:
-                    commits.append({
-                        'hash': parts[0],
-                        'author': parts[1],
-                        'email': parts[2],
-                        'date': parts[3],
-                        'message': parts[4]
-                    })
-            
-            return commits
+            return [commit async for commit in self.iter_commit_history(project_id, limit)]
         
         except Exception:
             return []
     
+    async def iter_commit_history(
+        self,
+        project_id: str,
+        limit: int = 10
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield commit dicts as git produces them
+        
+        Output is parsed record by record, so memory stays bounded
+        however large the history is.
+        
+        Args:
+            project_id: Project identifier
+            limit: Max commits to yield
+        
+        Yields:
+            Commit dicts (hash, author, email, date, message)
+        """
+        repo_dir = self._repo_dir(project_id)
+        
+        if not (repo_dir / '.git').exists():
+            return
+        
+        # Control-character separators can't collide with names or subjects
+        pending = b''
+        
+        async for chunk in self._stream_git_command(
+            ['log', f'-{limit}', '-z', _LOG_FORMAT],
+            cwd=repo_dir
+        ):
+            *records, pending = (pending + chunk).split(b'\0')
+            
+            for record in records:
+                commit = _parse_commit_record(record)
+                if commit:
+                    yield commit
+        
+        commit = _parse_commit_record(pending)
+        if commit:
+            yield commit
+    
     async def diff_changes(
         self,
         project_id: str,
@@ -231,25 +416,44 @@ Thumbs.db
         Returns:
             Diff output as string
         """
-        repo_dir = self.base_dir / project_id
-        
         try:
-            if commit1:
-                output = await self._run_git_command(
-                    ['diff', commit1, commit2],
-                    cwd=repo_dir
-                )
-            else:
-                output = await self._run_git_command(
-                    ['diff'],
-                    cwd=repo_dir
-                )
-            
-            return output
+            return ''.join([chunk async for chunk in self.iter_diff(project_id, commit1, commit2)])
         
         except Exception as e:
             return f"Error getting diff: {e}"
     
+    async def iter_diff(
+        self,
+        project_id: str,
+        commit1: str = None,
+        commit2: str = 'HEAD'
+    ) -> AsyncIterator[str]:
+        """
+        Yield a diff in chunks, e.g. to page it into Discord messages
+        
+        Args:
+            project_id: Project identifier
+            commit1: First commit (None = working directory)
+            commit2: Second commit (default: HEAD)
+        
+        Yields:
+            Decoded diff text chunks
+        """
+        repo_dir = self._repo_dir(project_id)
+        args = ['diff', commit1, commit2] if commit1 else ['diff']
+        
+        # Incremental decoder so multi-byte characters can span chunks
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        async for chunk in self._stream_git_command(args, cwd=repo_dir):
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        
+        text = decoder.decode(b'', final=True)
+        if text:
+            yield text
+    
     async def rollback_to_commit(
         self,
         project_id: str,
@@ -265,24 +469,26 @@ Thumbs.db
         Returns:
             True if successful
         """
-        repo_dir = self.base_dir / project_id
+        repo_dir = self._repo_dir(project_id)
         
-        try:
-            # Create rollback commit
-            await self._run_git_command(
-                ['revert', '--no-commit', f'{commit_hash}..HEAD'],
-                cwd=repo_dir
-            )
-            
-            await self._run_git_command(
-                ['commit', '-m', f'Rollback to {commit_hash[:8]}'],
-                cwd=repo_dir
-            )
+        async with self._lock_for(project_id):
+            try:
+                # Create rollback commit
+                await self._run_git_command(
+                    ['revert', '--no-commit', f'{commit_hash}..HEAD'],
+                    cwd=repo_dir,
+                    capture=False
+                )
+                
+                await self._run_git_command(
+                    ['commit', '-m', f'Rollback to {commit_hash[:8]}'],
+                    cwd=repo_dir
+                )
+                
+                return True
             
-            return True
-        
-        except Exception:
-            return False
+            except Exception:
+                return False
     
     async def setup_remote(
         self,
@@ -301,29 +507,32 @@ Thumbs.db
         Returns:
             True if successful
         """
-        repo_dir = self.base_dir / project_id
+        repo_dir = self._repo_dir(project_id)
         
-        try:
-            # Check if remote exists
-            remotes = await self._run_git_command(['remote'], cwd=repo_dir)
-            
-            if remote_name in remotes:
-                # Update existing remote
-                await self._run_git_command(
-                    ['remote', 'set-url', remote_name, remote_url],
-                    cwd=repo_dir
-                )
-            else:
-                # Add new remote
-                await self._run_git_command(
-                    ['remote', 'add', remote_name, remote_url],
-                    cwd=repo_dir
-                )
+        async with self._lock_for(project_id):
+            try:
+                # Check if remote exists
+                remotes = await self._run_git_command_sync(['remote'], cwd=repo_dir)
+                
+                self._remote_cache.pop(project_id, None)
+                
+                if remote_name in remotes:
+                    # Update existing remote
+                    await self._run_git_command_sync(
+                        ['remote', 'set-url', remote_name, remote_url],
+                        cwd=repo_dir
+                    )
+                else:
+                    # Add new remote
+                    await self._run_git_command_sync(
+                        ['remote', 'add', remote_name, remote_url],
+                        cwd=repo_dir
+                    )
+                
+                return True
             
-            return True
-        
-        except Exception:
-            return False
+            except Exception:
+                return False
     
     async def push_to_remote(
         self,
@@ -342,12 +551,13 @@ Thumbs.db
         Returns:
             True if successful
         """
-        repo_dir = self.base_dir / project_id
+        repo_dir = self._repo_dir(project_id)
         
         try:
             await self._run_git_command(
                 ['push', remote_name, branch],
-                cwd=repo_dir
+                cwd=repo_dir,
+                capture=False
             )
             return True
         
@@ -364,18 +574,139 @@ Thumbs.db
         Returns:
             True if remote exists
         """
-        repo_dir = self.base_dir / project_id
+        config_path = self._repo_dir(project_id) / '.git' / 'config'
+        
+        try:
+            st = config_path.stat()
+        except FileNotFoundError:
+            self._remote_cache.pop(project_id, None)
+            return False
         
-        if not (repo_dir / '.git' / 'config').exists():
+        # Re-parse only when the config file changed
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._remote_cache.get(project_id)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        # One read serves both the parser and the fallback scan
+        try:
+            data = config_path.read_text(errors='replace')
+        except FileNotFoundError:
+            self._remote_cache.pop(project_id, None)
             return False
         
-        config = (repo_dir / '.git' / 'config').read_text()
-        return '[remote "origin"]' in config
+        parser = configparser.ConfigParser(strict=False, allow_no_value=True, interpolation=None)
+        try:
+            parser.read_string(data)
+            result = parser.has_section('remote "origin"')
+        except configparser.Error:
+            result = '[remote "origin"]' in data
+        
+        self._remote_cache[project_id] = (key, result)
+        return result
     
-    async def _run_git_command(
+    def _lock_for(self, project_id: str) -> asyncio.Lock:
+        """
+        Lock serializing repository writes for a project
+        """
+        lock = self._repo_locks.get(project_id)
+        
+        if lock is None:
+            lock = self._repo_locks[project_id] = asyncio.Lock()
+        
+        return lock
+    
+    def _repo_dir(self, project_id: str) -> Path:
+        """
+        Repository directory for a project (one Path object per project)
+        """
+        repo_dir = self._repo_dirs.get(project_id)
+        
+        if repo_dir is None:
+            repo_dir = self._repo_dirs[project_id] = self.base_dir / project_id
+        
+        return repo_dir
+    
+    async def close(self):
+        """
+        Stop the persistent git processes
+        """
+        for batch in self._cat_file.values():
+            await batch.close()
+        
+        self._cat_file.clear()
+    
+    async def _resolve_ref(self, repo_dir: Path, ref: str) -> str:
+        """
+        Resolve a ref via the repository's persistent cat-file process
+        """
+        batch = self._cat_file.get(repo_dir)
+        
+        if batch is None:
+            batch = self._cat_file[repo_dir] = _CatFileBatch(repo_dir, self._git_env)
+        
+        return await batch.resolve(ref)
+    
+    async def _stream_git_command(
         self,
         args: list,
         cwd: Path
+    ) -> AsyncIterator[bytes]:
+        """
+        Run a Git command and yield its stdout in chunks
+        
+        Unlike _run_git_command the output is never held in memory as a
+        whole. Raises after the last chunk if git exits non-zero.
+        
+        Args:
+            args: Git command arguments
+            cwd: Working directory
+        
+        Yields:
+            Raw stdout chunks
+        """
+        async with self.process_semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    'git', *args,
+                    cwd=str(cwd),
+                    env=self._git_env,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise Exception("Git not installed. Please install git.")
+            
+            # Drain stderr alongside stdout so a chatty git can't block
+            stderr_task = asyncio.create_task(process.stderr.read())
+            
+            try:
+                while True:
+                    chunk = await process.stdout.read(_STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+                
+                stderr = await stderr_task
+                await process.wait()
+                
+                if process.returncode != 0:
+                    raise Exception(f"Git command failed: {stderr.decode()}")
+            
+            finally:
+                # Consumer stopped early or an error occurred
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                if not stderr_task.done():
+                    stderr_task.cancel()
+    
+    async def _run_git_command(
+        self,
+        args: list,
+        cwd: Path,
+        stdin_data: Optional[bytes] = None,
+        capture: bool = True
     ) -> str:
         """
         Run a Git command asynchronously
@@ -383,24 +714,69 @@ Thumbs.db
         Args:
             args: Git command arguments
             cwd: Working directory
+            stdin_data: Bytes to feed the command on stdin
+            capture: Collect stdout. Write-only commands pass False so
+                stdout goes to /dev/null (stderr is always kept for errors).
+                commit keeps it: "nothing to commit" is reported on stdout
         
         Returns:
-            Command output
+            Command output ('' when capture is False)
         """
         try:
-            process = await asyncio.create_subprocess_exec(
-                'git', *args,
-                cwd=str(cwd),
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            async with self.process_semaphore:
+                process = await asyncio.create_subprocess_exec(
+                    'git', *args,
+                    cwd=str(cwd),
+                    env=self._git_env,
+                    stdin=asyncio.subprocess.PIPE if stdin_data is not None else None,
+                    stdout=asyncio.subprocess.PIPE if capture else asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                
+                stdout, stderr = await process.communicate(stdin_data)
             
             if process.returncode != 0:
-                raise Exception(f"Git command failed: {stderr.decode()}")
+                # Some failures (e.g. "nothing to commit") only go to stdout
+                detail = stderr.decode().strip() or (stdout or b'').decode().strip()
+                raise Exception(f"Git command failed: {detail}")
+            
+            return stdout.decode() if capture else ''
+        
+        except FileNotFoundError:
+            raise Exception("Git not installed. Please install git.")
+    
+    async def _run_git_command_sync(self, args: list, cwd: Path) -> str:
+        """
+        Run a short Git command with subprocess.run in a worker thread
+        
+        For quick commands (remote, tag) this skips the asyncio
+        subprocess transport and child-watcher setup, which costs more
+        than the command itself. Long-running commands (push, anything
+        streamed) stay on _run_git_command.
+        
+        Args:
+            args: Git command arguments
+            cwd: Working directory
+        
+        Returns:
+            Command output
+        """
+        try:
+            async with self.process_semaphore:
+                result = await asyncio.to_thread(
+                    subprocess.run,
+                    ['git', *args],
+                    cwd=str(cwd),
+                    env=self._git_env,
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    check=False
+                )
+            
+            if result.returncode != 0:
+                raise Exception(f"Git command failed: {result.stderr.decode()}")
             
-            return stdout.decode()
+            return result.stdout.decode()
         
         except FileNotFoundError:
             raise Exception("Git not installed. Please install git.")
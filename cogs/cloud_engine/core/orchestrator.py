@@ -11,11 +11,18 @@ Think of this as the CloudSessionManager equivalent to the D&D system's CombatOr
 """
 
 import asyncio
+import functools
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable
 from pathlib import Path
 
-from ..models.session import CloudSession, DeploymentState, CloudResource, PlanResult
+from ..models.session import (
+    CloudSession, DeploymentState, CloudResource, PlanResult,
+    EDITABLE_STATES, UNCANCELLABLE_STATES
+)
 import cloud_database as db  # Use functional API
 from infrastructure_policy_validator import InfrastructurePolicyValidator
 from cloud_provisioning_generator import GCPGenerator, AWSGenerator, AzureGenerator
@@ -23,6 +30,58 @@ from .terraform_runner import TerraformRunner
 from .cost_estimator import CostEstimator
 from .git_manager import GitManager
 
+# Most audit events written per database transaction
+AUDIT_BATCH_SIZE = 64
+
+# Session cache bounds: max cached sessions, and how often expired ones are swept (seconds)
+MAX_CACHED_SESSIONS = 1024
+SESSION_SWEEP_INTERVAL = 60
+
+# Worker threads for blocking database calls made from async code
+DB_POOL_WORKERS = 4
+
+# Concurrent terraform plan/apply runs. Separate from GitManager's git
+# limit: a run holds its slot for minutes, and short git calls must not
+# queue behind it.
+MAX_CONCURRENT_TERRAFORM = 4
+
+
+def _write_blocks(path: Path, blocks: Iterable[str]):
+    """
+    Stream text blocks to a file, separated by blank lines (blocking, run in a thread)
+    
+    Each block is encoded and written as it is produced, so the full
+    file contents never exist as one string.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with open(path, 'wb', buffering=65536) as f:
+        separator = b''
+        for block in blocks:
+            f.write(separator)
+            f.write(block.encode('utf-8'))
+            separator = b'\n\n'
+
+
+def _read_text_if_exists(path: Path) -> Optional[str]:
+    """Read a file, or None if it doesn't exist (blocking, run in a thread)"""
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+
+
+def _save_tfstate(tfstate_path: Path, project_id: str, session_id: str):
+    """Store a run's terraform.tfstate in the database, if terraform wrote one (blocking, run in a thread)"""
+    tfstate_json = _read_text_if_exists(tfstate_path)
+    if tfstate_json is not None:
+        db.save_terraform_state(
+            project_id=project_id,
+            session_id=session_id,
+            tfstate_json=tfstate_json,
+            terraform_version='1.0'
+        )
+
 
 class CloudOrchestrator:
     """
@@ -45,8 +104,34 @@ class CloudOrchestrator:
             'azure': AzureGenerator()
         }
         
-        # Active sessions cache (session_id → CloudSession)
-        self._sessions: Dict[str, CloudSession] = {}
+        # provider -> resource type -> generator method
+        self._dispatch = {
+            provider: {
+                'compute_vm': generator.generate_vm,
+                'database': generator.generate_database,
+                'vpc': generator.generate_vpc,
+                # Add more resource types as needed
+            }
+            for provider, generator in self.generators.items()
+        }
+        
+        # Active sessions cache (session_id → CloudSession), least recently used first
+        self._sessions: "OrderedDict[str, CloudSession]" = OrderedDict()
+        self._sweep_task: Optional[asyncio.Task] = None
+        
+        # Audit events are queued and written in batches by _audit_writer
+        self._audit_queue: asyncio.Queue = asyncio.Queue()
+        self._audit_task: Optional[asyncio.Task] = None
+        
+        # Blocking db.* calls from async methods run here (see _db), so
+        # they neither stall the event loop nor crowd the default executor
+        self._db_pool = ThreadPoolExecutor(
+            max_workers=DB_POOL_WORKERS,
+            thread_name_prefix='cloud-db'
+        )
+        
+        # Shared by every TerraformRunner this orchestrator creates
+        self._terraform_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TERRAFORM)
     
     async def start_session(
         self,
@@ -68,7 +153,8 @@ class CloudOrchestrator:
             CloudSession in DRAFT state
         """
         # Create session in database
-        session_id = db.create_deployment_session(
+        session_id = await self._db(
+            db.create_deployment_session,
             project_id=project_id,
             user_id=user_id,
             ttl_minutes=ttl_minutes
@@ -87,10 +173,10 @@ class CloudOrchestrator:
         )
         
         # Cache session
-        self._sessions[session_id] = session
+        self._cache_session(session)
         
         # Audit log
-        db.log_audit_event(
+        self._audit(
             event_type='session_created',
             user_id=str(user_id),
             guild_id=self.guild_id or 'unknown',
@@ -119,6 +205,7 @@ class CloudOrchestrator:
                 del self._sessions[session_id]
                 return None
             
+            self._sessions.move_to_end(session_id)
             return session
         
         # Fallback to database
@@ -134,7 +221,7 @@ class CloudOrchestrator:
             return None
         
         # Cache it
-        self._sessions[session_id] = session
+        self._cache_session(session)
         
         return session
     
@@ -159,7 +246,7 @@ class CloudOrchestrator:
         if not session:
             return False
         
-        if session.state not in [DeploymentState.DRAFT, DeploymentState.VALIDATING]:
+        if session.state not in EDITABLE_STATES:
             return False  # Can't modify locked sessions
         
         # Create resource
@@ -204,7 +291,7 @@ class CloudOrchestrator:
         result = self.validator.validate_deployment(
             user_id=session.user_id,
             project_id=session.project_id,
-            resources=[r.to_dict() for r in session.resources]
+            resources=session.resources_payload
         )
         
         # Update session state based on result
@@ -238,7 +325,7 @@ class CloudOrchestrator:
             )
         
         # Check if session can be planned
-        if session.state not in [DeploymentState.DRAFT, DeploymentState.VALIDATING]:
+        if session.state not in EDITABLE_STATES:
             return PlanResult(
                 success=False,
                 errors=[f'Cannot plan session in state: {session.state.value}']
@@ -252,7 +339,7 @@ class CloudOrchestrator:
             terraform_dir = await self._generate_terraform_files(session)
             
             # 2. Create terraform runner
-            runner = TerraformRunner(terraform_dir)
+            runner = TerraformRunner(terraform_dir, semaphore=self._terraform_semaphore)
             
             # 3. Run terraform plan
             plan_result = await runner.plan()
@@ -261,7 +348,7 @@ class CloudOrchestrator:
             if plan_result.success:
                 cost_estimate = self.cost_estimator.estimate_deployment(
                     session.provider,
-                    [{'type': r.type, 'config': r.config} for r in session.resources]
+                    session.resources_payload
                 )
                 
                 plan_result.estimated_cost_hourly = cost_estimate.hourly_cost
@@ -275,7 +362,7 @@ class CloudOrchestrator:
                 session.update_state(DeploymentState.PLAN_READY)
                 
                 # Audit log
-                db.log_audit_event(
+                self._audit(
                     event_type='plan_completed',
                     user_id=str(session.user_id),
                     guild_id=self.guild_id or 'unknown',
@@ -293,7 +380,7 @@ class CloudOrchestrator:
                 session.update_state(DeploymentState.FAILED)
                 
                 # Audit log failure
-                db.log_audit_event(
+                self._audit(
                     event_type='plan_failed',
                     user_id=str(session.user_id),
                     guild_id=self.guild_id or 'unknown',
@@ -311,7 +398,7 @@ class CloudOrchestrator:
             session.update_state(DeploymentState.FAILED)
             
             # Audit log exception
-            db.log_audit_event(
+            self._audit(
                 event_type='plan_error',
                 user_id=str(session.user_id),
                 guild_id=self.guild_id or 'unknown',
@@ -378,7 +465,7 @@ class CloudOrchestrator:
             terraform_dir = f"terraform_runs/{session_id}"
             
             # Create runner
-            runner = TerraformRunner(terraform_dir)
+            runner = TerraformRunner(terraform_dir, semaphore=self._terraform_semaphore)
             
             # Run apply
             success, output = await runner.apply()
@@ -387,37 +474,37 @@ class CloudOrchestrator:
             if success:
                 session.update_state(DeploymentState.APPLIED)
                 
-                # Commit terraform configuration to Git
-                commit_result = await self.git_manager.commit_configuration(
-                    project_id=session.project_id,
-                    user_id=session.user_id,
-                    message=f"Deploy {len(session.resources)} resources via session {session_id[:8]}",
-                    files=None  # Commit all files
-                )
-                
-                # Save terraform state to database
-                # (In production, parse tfstate file from terraform_dir)
-                tfstate_path = Path(terraform_dir) / 'terraform.tfstate'
-                if tfstate_path.exists():
-                    tfstate_json = tfstate_path.read_text()
-                    db.save_terraform_state(
+                # Git commit, tfstate save and history touch independent
+                # resources (git dir vs database), so run them concurrently
+                commit_result, _, _ = await asyncio.gather(
+                    # Commit terraform configuration to Git
+                    self.git_manager.commit_configuration(
+                        project_id=session.project_id,
+                        user_id=session.user_id,
+                        message=f"Deploy {len(session.resources)} resources via session {session_id[:8]}",
+                        files=None  # Commit changes to tracked files
+                    ),
+                    # Save terraform state to database
+                    # (In production, parse tfstate file from terraform_dir)
+                    self._db(
+                        _save_tfstate,
+                        Path(terraform_dir) / 'terraform.tfstate',
+                        session.project_id,
+                        session_id
+                    ),
+                    # Record in history
+                    self._db(
+                        db.record_deployment_history,
                         project_id=session.project_id,
-                        session_id=session_id,
-                        tfstate_json=tfstate_json,
-                        terraform_version='1.0'
+                        user_id=session.user_id,
+                        action='apply',
+                        resources=len(session.resources),
+                        success=True
                     )
-                
-                # Record in history
-                db.record_deployment_history(
-                    project_id=session.project_id,
-                    user_id=session.user_id,
-                    action='apply',
-                    resources=len(session.resources),
-                    success=True
                 )
                 
                 # Audit log success
-                db.log_audit_event(
+                self._audit(
                     event_type='deployment_completed',
                     user_id=str(session.user_id),
                     guild_id=self.guild_id or 'unknown',
@@ -433,7 +520,8 @@ class CloudOrchestrator:
                 session.update_state(DeploymentState.FAILED)
                 
                 # Record failure
-                db.record_deployment_history(
+                await self._db(
+                    db.record_deployment_history,
                     project_id=session.project_id,
                     user_id=session.user_id,
                     action='apply',
@@ -442,7 +530,7 @@ class CloudOrchestrator:
                 )
                 
                 # Audit log failure
-                db.log_audit_event(
+                self._audit(
                     event_type='deployment_failed',
                     user_id=str(session.user_id),
                     guild_id=self.guild_id or 'unknown',
@@ -457,7 +545,7 @@ class CloudOrchestrator:
             session.update_state(DeploymentState.FAILED)
             
             # Audit log exception
-            db.log_audit_event(
+            self._audit(
                 event_type='deployment_error',
                 user_id=str(session.user_id),
                 guild_id=self.guild_id or 'unknown',
@@ -482,7 +570,7 @@ class CloudOrchestrator:
             return False
         
         # Can only cancel if not already applying/applied
-        if session.state in [DeploymentState.APPLYING, DeploymentState.APPLIED]:
+        if session.state in UNCANCELLABLE_STATES:
             return False
         
         session.update_state(DeploymentState.CANCELLED)
@@ -491,62 +579,211 @@ class CloudOrchestrator:
         if session_id in self._sessions:
             del self._sessions[session_id]
         
+        # Make sure the session's audit trail is on disk
+        await self.flush_audit_log()
+        
         return True
     
+    def _cache_session(self, session: CloudSession):
+        """
+        Add a session to the LRU cache, evicting the oldest beyond MAX_CACHED_SESSIONS
+        """
+        self._sessions[session.id] = session
+        self._sessions.move_to_end(session.id)
+        
+        while len(self._sessions) > MAX_CACHED_SESSIONS:
+            self._sessions.popitem(last=False)
+        
+        if self._sweep_task is None or self._sweep_task.done():
+            try:
+                self._sweep_task = asyncio.get_running_loop().create_task(self._sweep_expired())
+            except RuntimeError:
+                pass  # Not on the event loop; the size bound still applies
+    
+    async def _sweep_expired(self):
+        """
+        Periodically drop expired sessions from the cache
+        """
+        while True:
+            await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+            
+            now = time.time()
+            expired = [sid for sid, session in self._sessions.items() if session.is_expired_at(now)]
+            for session_id in expired:
+                del self._sessions[session_id]
+    
+    async def _db(self, fn, *args, **kwargs):
+        """
+        Run a blocking database call on the bounded DB thread pool
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._db_pool, functools.partial(fn, *args, **kwargs)
+        )
+    
+    def _audit(self, **event):
+        """
+        Queue an audit event (same arguments as db.log_audit_event)
+        
+        Never blocks; the writer task is started on first use.
+        """
+        event.setdefault('timestamp', time.time())
+        self._audit_queue.put_nowait(event)
+        
+        if self._audit_task is None or self._audit_task.done():
+            self._audit_task = asyncio.create_task(self._audit_writer())
+    
+    async def _audit_writer(self):
+        """
+        Drain the audit queue, writing up to AUDIT_BATCH_SIZE events per transaction
+        """
+        while True:
+            batch = [await self._audit_queue.get()]
+            
+            while len(batch) < AUDIT_BATCH_SIZE:
+                try:
+                    batch.append(self._audit_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            
+            try:
+                await self._db(db.log_audit_events_bulk, batch)
+            except Exception:
+                # One bad event shouldn't drop the rest of the batch
+                for event in batch:
+                    try:
+                        await self._db(db.log_audit_events_bulk, [event])
+                    except Exception as e:
+                        print(f"Failed to write audit event {event.get('event_type')}: {e}")
+            finally:
+                for _ in batch:
+                    self._audit_queue.task_done()
+    
+    async def flush_audit_log(self):
+        """
+        Wait until every queued audit event has been written
+        """
+        if self._audit_task is not None and not self._audit_task.done():
+            await self._audit_queue.join()
+    
+    async def close(self):
+        """
+        Flush pending audit events and stop background work
+        """
+        await self.flush_audit_log()
+        
+        if self._audit_task is not None:
+            self._audit_task.cancel()
+            self._audit_task = None
+        
+        if self._sweep_task is not None:
+            self._sweep_task.cancel()
+            self._sweep_task = None
+        
+        await self.git_manager.close()
+        self._db_pool.shutdown(wait=False)
+    
+    async def cancel_session_owned(self, session_id: str, user_id: int) -> str:
+        """
+        Cancel a session on behalf of its owner
+        
+        Combines the lookup, ownership check and cancel into one
+        conditional database UPDATE instead of get_session + cancel_session.
+        
+        Returns: 'ok', 'not_found', 'forbidden' or 'bad_state'
+        """
+        session = self._sessions.get(session_id)
+        cached = session is not None and not session.is_expired
+        
+        if cached:
+            # The cached session holds the authoritative workflow state
+            if session.owner_id != user_id:
+                return 'forbidden'
+            
+            if session.state in UNCANCELLABLE_STATES:
+                return 'bad_state'
+        
+        result = await self._db(
+            db.cancel_deployment_session, session_id, str(user_id)
+        )
+        
+        if result != 'ok':
+            return result
+        
+        if cached:
+            session.update_state(DeploymentState.CANCELLED)
+            self._sessions.pop(session_id, None)
+        
+        # Audit log
+        self._audit(
+            event_type='session_cancelled',
+            user_id=str(user_id),
+            guild_id=self.guild_id or 'unknown',
+            action='cancel_deployment_session',
+            project_id=session.project_id if cached else None,
+            session_id=session_id
+        )
+        
+        # Make sure the session's audit trail is on disk
+        await self.flush_audit_log()
+        
+        return result
+    
     async def _generate_terraform_files(self, session: CloudSession) -> str:
         """
         Generate terraform .tf files for a session
         
         Returns: Path to terraform directory
         """
-        # Create working directory
         terraform_dir = Path(f"terraform_runs/{session.id}")
-        terraform_dir.mkdir(parents=True, exist_ok=True)
         
-        # Get generator
-        generator = self.generators.get(session.provider)
+        # Get generator methods for this provider
+        dispatch = self._dispatch.get(session.provider)
         
-        if not generator:
+        if not dispatch:
             raise ValueError(f"Unknown provider: {session.provider}")
         
-        # Generate terraform configuration
-        tf_config = []
-        
-        for resource in session.resources:
-            if resource.type == 'compute_vm':
-                tf_config.append(generator.generate_vm(resource.config))
-            elif resource.type == 'database':
-                tf_config.append(generator.generate_database(resource.config))
-            elif resource.type == 'vpc':
-                tf_config.append(generator.generate_vpc(resource.config))
-            # Add more resource types as needed
+        # Generate terraform configuration lazily; unsupported types are skipped
+        tf_config = (
+            dispatch[resource.type](resource.config)
+            for resource in tuple(session.resources)  # Snapshot; runs in a thread
+            if resource.type in dispatch
+        )
         
-        # Write main.tf
+        # Create working directory and write main.tf off the event loop,
+        # generating and writing one block at a time
         main_tf = terraform_dir / 'main.tf'
-        main_tf.write_text('\n\n'.join(tf_config))
+        await asyncio.to_thread(_write_blocks, main_tf, tf_config)
         
         return str(terraform_dir)
     
-    def get_user_sessions(self, user_id: int, include_expired: bool = False) -> List[CloudSession]:
+    def get_user_sessions(
+        self,
+        user_id: int,
+        include_expired: bool = False,
+        limit: Optional[int] = None
+    ) -> List[CloudSession]:
         """
         Get all sessions for a user
         
+        Expired sessions and the limit are filtered in one database query.
+        
         Returns: List of CloudSession objects
         """
         # Get from database
-        db_sessions = db.get_user_deployment_sessions(user_id)
+        db_sessions = db.get_user_deployment_sessions(user_id, include_expired, limit)
         
-        sessions = []
+        if include_expired:
+            return [CloudSession.from_dict(db_session) for db_session in db_sessions]
         
-        for db_session in db_sessions:
-            session = CloudSession.from_dict(db_session)
-            
-            if not include_expired and session.is_expired:
-                continue
-            
-            sessions.append(session)
+        # Rows that expired since the query ran are dropped on the raw
+        # expires_at, before a CloudSession is built for them
+        now = time.time()
         
-        return sessions
+        return [
+            CloudSession.from_dict(db_session)
+            for db_session in db_sessions
+            if db_session.get('expires_at', now) >= now
+        ]
     
     def get_project_quota(self, project_id: str) -> Dict[str, Any]:
         """
@@ -6,14 +6,133 @@ Streams output to Discord threads for real-time monitoring.
 """
 
 import asyncio
+import codecs
+import contextlib
+import functools
+import itertools
+import json
 import os
 import re
-from typing import Optional, Tuple, AsyncGenerator
+from typing import Dict, Optional, Tuple, AsyncGenerator
 from pathlib import Path
 
 from ..models.session import PlanResult
 
 
+# Plan output patterns, compiled once at import
+# Example summary: "Plan: 2 to add, 0 to change, 0 to destroy."
+_PLAN_RE = re.compile(r'Plan:\s+(\d+)\s+to\s+add,\s+(\d+)\s+to\s+change,\s+(\d+)\s+to\s+destroy')
+_WARNING_RES = (
+    re.compile(r'Warning:\s+(.+)', re.MULTILINE),
+    re.compile(r'⚠\s+(.+)', re.MULTILINE),
+)
+
+# Plan diagnostics that mean the directory needs a real `terraform init`
+# (providers or modules missing, or a stale dependency lock file)
+_NEEDS_INIT_MARKERS = (
+    'terraform init',
+    'Missing required provider',
+    'Required plugins are not installed',
+    'Module not installed',
+    'Inconsistent dependency lock file',
+)
+
+# Read size for streamed terraform output
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# StreamReader buffer limit for terraform pipes: output bursts are buffered
+# in the loop instead of pausing the pipe (and the child) at asyncio's 64 KiB default
+_STREAM_BUFFER_LIMIT = 1 << 20
+
+# Working directories already created by this process (skip the mkdir syscalls)
+_CREATED_DIRS: set = set()
+
+# Provider plugin cache shared by every session directory (TF_PLUGIN_CACHE_DIR
+# in the bot's environment takes precedence)
+DEFAULT_PLUGIN_CACHE_DIR = "terraform_runs/.plugin-cache"
+
+# The plugin cache isn't safe for concurrent writers, so inits run one at a time
+_INIT_LOCK = asyncio.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _terraform_env() -> Dict[str, str]:
+    """
+    Environment for terraform subprocesses, built once
+    
+    Every session has its own working directory, so without a shared
+    plugin cache each `terraform init` downloads and unpacks its own
+    copy of every provider.
+    
+    Terraform 1.4+ only reuses cached providers when the directory's
+    .terraform.lock.hcl already lists them, and a fresh session directory
+    has no lock file. TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE is
+    set on purpose so init links from the cache anyway; the lock file
+    then only records checksums for this platform, which is fine for
+    generated, single-host session directories. Either variable in the
+    bot's environment takes precedence.
+    """
+    cache_dir = Path(os.environ.get('TF_PLUGIN_CACHE_DIR', DEFAULT_PLUGIN_CACHE_DIR)).absolute()
+    cache_dir.mkdir(parents=True, exist_ok=True)  # terraform ignores a missing cache dir
+    
+    return {
+        'TF_PLUGIN_CACHE_MAY_BREAK_DEPENDENCY_LOCK_FILE': '1',
+        **os.environ,
+        'TF_PLUGIN_CACHE_DIR': str(cache_dir),  # Absolute: terraform runs in each session dir
+        'TF_IN_AUTOMATION': '1'  # No interactive next-step hints in output
+    }
+
+
+async def _read_text(stream: asyncio.StreamReader) -> str:
+    """
+    Read a pipe to EOF, decoding chunk by chunk
+    
+    The whole output never exists as bytes and str at the same time.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    parts = []
+    
+    while True:
+        chunk = await stream.read(_STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts.append(decoder.decode(chunk))
+    
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
+async def _pump_lines(stream: asyncio.StreamReader, queue: asyncio.Queue):
+    """
+    Read a pipe in large chunks and queue its lines, one list per chunk
+    
+    Puts None when the stream reaches EOF.
+    """
+    try:
+        # Decode whole chunks (one decoder call each, not one per line);
+        # the incremental decoder carries characters split across chunks
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        pending = ''
+        
+        while True:
+            chunk = await stream.read(_STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            
+            *lines, pending = (pending + decoder.decode(chunk)).split('\n')
+            
+            if lines:
+                queue.put_nowait([line.rstrip() for line in lines])
+        
+        # Last line without a trailing newline
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            queue.put_nowait([pending.rstrip()])
+    
+    finally:
+        queue.put_nowait(None)
+
+
 class TerraformRunner:
     """
     Async terraform execution engine
@@ -21,18 +140,37 @@ class TerraformRunner:
     Runs terraform commands as subprocesses and streams output.
     """
     
-    def __init__(self, working_dir: str):
+    # Working directories initialized by this process (skip init, and its stat, on replans)
+    _initialized: set = set()
+    
+    def __init__(self, working_dir: str, semaphore: Optional[asyncio.Semaphore] = None):
         self.working_dir = Path(working_dir)
-        self.working_dir.mkdir(parents=True, exist_ok=True)
+        
+        if self.working_dir not in _CREATED_DIRS:
+            self.working_dir.mkdir(parents=True, exist_ok=True)
+            _CREATED_DIRS.add(self.working_dir)
+        
+        # Optional limit on concurrent terraform runs, shared between runners
+        self._semaphore = semaphore if semaphore is not None else contextlib.nullcontext()
     
     async def init(self) -> Tuple[bool, str]:
         """
         Run terraform init
         
+        Serialized process-wide: concurrent inits would write to the
+        shared plugin cache at the same time.
+        
         Returns: (success, output)
         """
         cmd = ["terraform", "init", "-no-color"]
-        return await self._run_command(cmd)
+        
+        async with _INIT_LOCK:
+            success, output = await self._run_command(cmd)
+        
+        if success:
+            TerraformRunner._initialized.add(self.working_dir)
+        
+        return success, output
     
     async def plan(self, out_file: str = "tfplan") -> PlanResult:
         """
@@ -41,30 +179,58 @@ class TerraformRunner:
         This is the critical "Plan-First" step.
         Returns: PlanResult with change summary
         """
-        # First ensure terraform is initialized
-        init_success, init_output = await self.init()
+        # First ensure terraform is initialized; a directory with providers
+        # already installed (or initialized earlier in this process) skips init
+        skipped_init = self._is_initialized()
         
-        if not init_success:
-            return PlanResult(
-                success=False,
-                errors=[f"Terraform init failed: {init_output}"]
-            )
+        if not skipped_init:
+            init_success, init_output = await self.init()
+            
+            if not init_success:
+                return PlanResult(
+                    success=False,
+                    errors=[f"Terraform init failed: {init_output}"]
+                )
         
-        # Run plan
-        cmd = ["terraform", "plan", "-no-color", f"-out={out_file}"]
+        # Run plan (machine-readable event stream)
+        cmd = ["terraform", "plan", "-no-color", "-json", f"-out={out_file}"]
         success, output = await self._run_command(cmd)
         
+        # The config may need providers or modules that aren't installed
+        # yet: init for real and retry once. Any other failure is returned
+        # as is rather than paying for a second init + plan.
+        if not success and skipped_init and any(marker in output for marker in _NEEDS_INIT_MARKERS):
+            TerraformRunner._initialized.discard(self.working_dir)
+            init_success, init_output = await self.init()
+            
+            if not init_success:
+                return PlanResult(
+                    success=False,
+                    errors=[f"Terraform init failed: {init_output}"]
+                )
+            
+            success, output = await self._run_command(cmd)
+        
+        # Parse plan events
+        plan_result = self._parse_plan_json(output)
+        
+        if plan_result is None:
+            # Terraform without plan -json support: run again with text output
+            cmd = ["terraform", "plan", "-no-color", f"-out={out_file}"]
+            success, output = await self._run_command(cmd)
+            
+            if success:
+                plan_result = self._parse_plan_output(output)
+                plan_result.plan_output = output
+        
         if not success:
             return PlanResult(
                 success=False,
-                plan_output=output,
-                errors=["Terraform plan failed"]
+                plan_output=plan_result.plan_output if plan_result else output,
+                errors=["Terraform plan failed", *(plan_result.errors if plan_result else ())]
             )
         
-        # Parse plan output
-        plan_result = self._parse_plan_output(output)
         plan_result.success = True
-        plan_result.plan_output = output
         
         return plan_result
     
@@ -112,18 +278,31 @@ class TerraformRunner:
         """
         Run a terraform command and capture output
         
+        stdout and stderr use separate pipes drained concurrently; the
+        output is stdout followed by stderr.
+        
         Returns: (success, output)
         """
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-                cwd=str(self.working_dir)
-            )
+            async with self._semaphore:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(self.working_dir),
+                    env=_terraform_env(),
+                    limit=_STREAM_BUFFER_LIMIT
+                )
+                
+                stdout, stderr = await asyncio.gather(
+                    _read_text(process.stdout),
+                    _read_text(process.stderr)
+                )
+                await process.wait()
             
-            stdout, _ = await process.communicate()
-            output = stdout.decode('utf-8', errors='replace')
+            if stdout and stderr and not stdout.endswith('\n'):
+                stdout += '\n'
+            output = stdout + stderr
             
             success = process.returncode == 0
             return success, output
@@ -137,28 +316,104 @@ class TerraformRunner:
         """
         Stream command output line-by-line
         
+        stdout and stderr are read from separate pipes and their lines
+        interleaved as they arrive (order is kept within each stream).
+        
         Yields: Individual output lines
         """
         try:
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.STDOUT,
-                cwd=str(self.working_dir)
-            )
-            
-            while True:
-                line = await process.stdout.readline()
-                if not line:
-                    break
+            async with self._semaphore:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=str(self.working_dir),
+                    env=_terraform_env(),
+                    limit=_STREAM_BUFFER_LIMIT
+                )
                 
-                yield line.decode('utf-8', errors='replace').rstrip()
-            
-            await process.wait()
+                queue: asyncio.Queue = asyncio.Queue()
+                pumps = [
+                    asyncio.create_task(_pump_lines(process.stdout, queue)),
+                    asyncio.create_task(_pump_lines(process.stderr, queue))
+                ]
+                
+                try:
+                    open_streams = len(pumps)
+                    
+                    while open_streams:
+                        lines = await queue.get()
+                        
+                        if lines is None:
+                            open_streams -= 1
+                            continue
+                        
+                        for line in lines:
+                            yield line
+                    
+                    await process.wait()
+                
+                finally:
+                    # Consumer stopped early or an error occurred
+                    if process.returncode is None:
+                        process.kill()
+                        await process.wait()
+                    for pump in pumps:
+                        if not pump.done():
+                            pump.cancel()
         
         except Exception as e:
             yield f"Error: {e}"
     
+    def _parse_plan_json(self, output: str) -> Optional[PlanResult]:
+        """
+        Build a PlanResult from `terraform plan -json` events
+        
+        Counts come from the change_summary event and warnings/errors from
+        diagnostic events; plan_output is rebuilt from each event's
+        human-readable @message. Returns None if the output holds no JSON
+        events (terraform too old for plan -json).
+        """
+        result = PlanResult(success=True)
+        messages = []
+        saw_events = False
+        
+        for line in output.splitlines():
+            if not line.startswith('{'):
+                messages.append(line)
+                continue
+            
+            try:
+                event = json.loads(line)
+            except ValueError:
+                messages.append(line)
+                continue
+            
+            saw_events = True
+            messages.append(event.get('@message', ''))
+            kind = event.get('type')
+            
+            if kind == 'change_summary':
+                changes = event.get('changes', {})
+                result.resources_to_add = changes.get('add', 0)
+                result.resources_to_change = changes.get('change', 0)
+                result.resources_to_destroy = changes.get('remove', 0)
+            
+            elif kind == 'diagnostic':
+                diagnostic = event.get('diagnostic', {})
+                summary = diagnostic.get('summary', '')
+                
+                if diagnostic.get('severity') == 'error':
+                    result.errors.append(summary)
+                elif len(result.warnings) < 5:  # Limit to 5 warnings
+                    result.warnings.append(summary)
+        
+        if not saw_events:
+            return None
+        
+        result.plan_output = '\n'.join(messages)
+        return result
+    
     def _parse_plan_output(self, output: str) -> PlanResult:
         """
         Parse terraform plan output to extract change summary
@@ -167,33 +422,41 @@ class TerraformRunner:
         """
         result = PlanResult(success=True)
         
-        # Look for plan summary line
-        # Example: "Plan: 2 to add, 0 to change, 0 to destroy."
-        plan_pattern = r'Plan:\s+(\d+)\s+to\s+add,\s+(\d+)\s+to\s+change,\s+(\d+)\s+to\s+destroy'
-        match = re.search(plan_pattern, output)
+        # A "No changes" plan leaves the counts at 0, so only scan for the
+        # summary line when there is no no-op message. Terraform prints
+        # "No changes. Your infrastructure matches the configuration." on
+        # one line, so the first phrase alone finds it in one scan.
+        no_changes = "No changes" in output
         
-        if match:
-            result.resources_to_add = int(match.group(1))
-            result.resources_to_change = int(match.group(2))
-            result.resources_to_destroy = int(match.group(3))
+        if not no_changes:
+            # Look for plan summary line
+            match = _PLAN_RE.search(output)
+            
+            if match:
+                result.resources_to_add = int(match.group(1))
+                result.resources_to_change = int(match.group(2))
+                result.resources_to_destroy = int(match.group(3))
         
-        # Look for "No changes" message
-        if "No changes" in output or "Your infrastructure matches the configuration" in output:
-            result.resources_to_add = 0
-            result.resources_to_change = 0
-            result.resources_to_destroy = 0
+        # Extract warnings; finditer stops after the 5th match instead of
+        # findall collecting every warning only to slice it
+        for pattern in _WARNING_RES:
+            matches = itertools.islice(pattern.finditer(output), 5)  # Limit to 5 warnings
+            result.warnings.extend(match.group(1) for match in matches)
         
-        # Extract warnings
-        warning_patterns = [
-            r'Warning:\s+(.+)',
-            r'⚠\s+(.+)',
-        ]
+        return result
+    
+    def _is_initialized(self) -> bool:
+        """
+        Check whether terraform init can be skipped for this directory
+        """
+        if self.working_dir in TerraformRunner._initialized:
+            return True
         
-        for pattern in warning_patterns:
-            warnings = re.findall(pattern, output, re.MULTILINE)
-            result.warnings.extend(warnings[:5])  # Limit to 5 warnings
+        if (self.working_dir / '.terraform' / 'providers').is_dir():
+            TerraformRunner._initialized.add(self.working_dir)
+            return True
         
-        return result
+        return False
     
     @staticmethod
     def create_for_session(session_id: str) -> 'TerraformRunner':
@@ -6,12 +6,20 @@ Similar to how D&D has Character sheets, Cloud has Session state.
 """
 
 from dataclasses import dataclass, field
+from operator import itemgetter
 from typing import List, Dict, Optional
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import datetime
+import sys
 import time
 
 
+# Keys every stored session has, fetched in one call by CloudSession.from_dict
+_SESSION_REQUIRED_KEYS = itemgetter(
+    'session_id', 'project_id', 'owner_id', 'guild_id', 'channel_id', 'provider', 'region'
+)
+
+
 class DeploymentState(Enum):
     """Deployment lifecycle states"""
     DRAFT = "draft"              # Just created
@@ -26,7 +34,23 @@ class DeploymentState(Enum):
     EXPIRED = "expired"          # Session timeout
 
 
-@dataclass
+# State groups for membership checks (frozensets: one hash lookup, no list per call)
+LOCKED_STATES = frozenset({        # Resources can't be modified
+    DeploymentState.PLANNING,
+    DeploymentState.APPLYING,
+    DeploymentState.APPLIED
+})
+EDITABLE_STATES = frozenset({      # Resources can be added / plan can run
+    DeploymentState.DRAFT,
+    DeploymentState.VALIDATING
+})
+UNCANCELLABLE_STATES = frozenset({ # Too late to cancel
+    DeploymentState.APPLYING,
+    DeploymentState.APPLIED
+})
+
+
+@dataclass(slots=True)
 class PlanResult:
     """Terraform plan result"""
     success: bool
@@ -64,9 +88,9 @@ class PlanResult:
         return self.estimated_cost_hourly * 24 * 30
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CloudResource:
-    """Individual resource to deploy"""
+    """Individual resource to deploy (immutable; build a new one to change it)"""
     type: str  # vm, database, bucket, etc.
     name: str
     config: Dict
@@ -74,19 +98,36 @@ class CloudResource:
     region: str = "us-central1"
     zone: Optional[str] = None
     
+    # Memoized to_dict() result
+    _dict: Optional[Dict] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Few distinct values, many copies from JSON/DB rows: share one
+        # string object each so comparisons and dict lookups hit identity
+        intern = sys.intern
+        object.__setattr__(self, 'type', intern(self.type))
+        object.__setattr__(self, 'provider', intern(self.provider))
+        object.__setattr__(self, 'region', intern(self.region))
+    
     def to_dict(self) -> Dict:
-        """Convert to dictionary for storage"""
-        return {
-            'type': self.type,
-            'name': self.name,
-            'config': self.config,
-            'provider': self.provider,
-            'region': self.region,
-            'zone': self.zone
-        }
+        """Convert to dictionary for storage (built once; don't mutate the result)"""
+        data = self._dict
+        
+        if data is None:
+            data = {
+                'type': self.type,
+                'name': self.name,
+                'config': self.config,
+                'provider': self.provider,
+                'region': self.region,
+                'zone': self.zone
+            }
+            object.__setattr__(self, '_dict', data)
+        
+        return data
 
 
-@dataclass
+@dataclass(slots=True)
 class CloudSession:
     """
     Main session state object
@@ -111,10 +152,10 @@ class CloudSession:
     # State
     state: DeploymentState = DeploymentState.DRAFT
     
-    # Timestamps
-    created_at: float = field(default_factory=time.time)
-    updated_at: float = field(default_factory=time.time)
-    expires_at: float = field(default_factory=lambda: time.time() + 1800)  # 30 min
+    # Timestamps (0.0 = unset; filled from one clock read in __post_init__)
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    expires_at: float = 0.0  # Default: created + 30 min
     
     # Plan result (populated after terraform plan)
     plan_result: Optional[PlanResult] = None
@@ -129,6 +170,25 @@ class CloudSession:
     # Terraform state
     terraform_output_dir: Optional[str] = None
     
+    # Approval (set by the orchestrator when the plan is approved)
+    approved_by: Optional[int] = None
+    approved_at: Optional[datetime] = None
+    
+    # Memoized resources_payload (rebuilt after resources change)
+    _resources_payload: Optional[List[Dict]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def __post_init__(self):
+        if not (self.created_at and self.updated_at and self.expires_at):
+            now = time.time()
+            if not self.created_at:
+                self.created_at = now
+            if not self.updated_at:
+                self.updated_at = now
+            if not self.expires_at:
+                self.expires_at = now + 1800  # 30 min
+    
     @property
     def is_expired(self) -> bool:
         """Check if session has expired"""
@@ -137,11 +197,7 @@ class CloudSession:
     @property
     def is_locked(self) -> bool:
         """Check if session is locked (can't be modified)"""
-        return self.state in [
-            DeploymentState.PLANNING,
-            DeploymentState.APPLYING,
-            DeploymentState.APPLIED
-        ]
+        return self.state in LOCKED_STATES
     
     @property
     def can_approve(self) -> bool:
@@ -165,11 +221,32 @@ class CloudSession:
         """Total number of resources"""
         return len(self.resources)
     
+    @property
+    def resources_payload(self) -> List[Dict]:
+        """
+        Resources as dictionaries, shared by validation, cost estimation and planning
+        
+        Built once and reused until the resources change; callers must
+        not mutate the returned list.
+        """
+        if self._resources_payload is None:
+            self._resources_payload = [r.to_dict() for r in self.resources]
+        return self._resources_payload
+    
+    def is_expired_at(self, now: float) -> bool:
+        """Check expiry against a caller-supplied time.time() snapshot"""
+        return now > self.expires_at
+    
+    def time_remaining_at(self, now: float) -> int:
+        """Remaining seconds relative to a caller-supplied time.time() snapshot"""
+        return max(0, int(self.expires_at - now))
+    
     def add_resource(self, resource: CloudResource):
         """Add a resource to the session"""
         if self.is_locked:
             raise ValueError(f"Cannot add resources in state: {self.state}")
         self.resources.append(resource)
+        self._resources_payload = None
         self.updated_at = time.time()
     
     def update_state(self, new_state: DeploymentState):
@@ -180,6 +257,7 @@ class CloudSession:
     def set_plan_result(self, plan_result: PlanResult):
         """Set terraform plan result"""
         self.plan_result = plan_result
+        self._resources_payload = None
         self.updated_at = time.time()
         
         if plan_result.success:
@@ -202,7 +280,7 @@ class CloudSession:
             'channel_id': str(self.channel_id),
             'provider': self.provider,
             'region': self.region,
-            'resources': [r.to_dict() for r in self.resources],
+            'resources': list(self.resources_payload),
             'state': self.state.value,
             'created_at': self.created_at,
             'updated_at': self.updated_at,
@@ -215,24 +293,29 @@ class CloudSession:
     @classmethod
     def from_dict(cls, data: Dict) -> 'CloudSession':
         """Create session from dictionary"""
+        session_id, project_id, owner_id, guild_id, channel_id, provider, region = (
+            _SESSION_REQUIRED_KEYS(data)
+        )
+        get = data.get
+        
         resources = [
-            CloudResource(**r) for r in data.get('resources', [])
+            CloudResource(**r) for r in get('resources', ())
         ]
         
         return cls(
-            id=data['session_id'],
-            project_id=data['project_id'],
-            owner_id=int(data['owner_id']),
-            guild_id=int(data['guild_id']),
-            channel_id=int(data['channel_id']),
-            provider=data['provider'],
-            region=data['region'],
+            id=session_id,
+            project_id=project_id,
+            owner_id=int(owner_id),
+            guild_id=int(guild_id),
+            channel_id=int(channel_id),
+            provider=sys.intern(provider),
+            region=sys.intern(region),
             resources=resources,
-            state=DeploymentState(data.get('state', 'draft')),
-            created_at=data.get('created_at', time.time()),
-            updated_at=data.get('updated_at', time.time()),
-            expires_at=data.get('expires_at', time.time() + 1800),
-            deployment_type=data.get('deployment_type', 'single'),
-            thread_id=data.get('thread_id'),
-            terraform_output_dir=data.get('terraform_output_dir')
+            state=DeploymentState(get('state', 'draft')),
+            created_at=get('created_at', 0.0),  # Missing ones are filled by __post_init__
+            updated_at=get('updated_at', 0.0),
+            expires_at=get('expires_at', 0.0),
+            deployment_type=get('deployment_type', 'single'),
+            thread_id=get('thread_id'),
+            terraform_output_dir=get('terraform_output_dir')
         )
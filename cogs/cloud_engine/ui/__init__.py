@@ -1,15 +1,34 @@
 """
 UI components for cloud provisioning
+
+Submodules are imported on first attribute access (PEP 562), so loading
+the package doesn't pull in discord.ui views and modals until one is used.
 """
 
-from .lobby_view import DeploymentLobbyView, AddResourceModal, ResourceTypeSelectView
-from .resource_modals import (
-    create_resource_modal,
-    VMResourceModal,
-    DatabaseResourceModal,
-    VPCResourceModal,
-    StorageBucketModal
-)
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .lobby_view import DeploymentLobbyView, AddResourceModal, ResourceTypeSelectView
+    from .resource_modals import (
+        create_resource_modal,
+        VMResourceModal,
+        DatabaseResourceModal,
+        VPCResourceModal,
+        StorageBucketModal
+    )
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    'DeploymentLobbyView': 'lobby_view',
+    'AddResourceModal': 'lobby_view',
+    'ResourceTypeSelectView': 'lobby_view',
+    'create_resource_modal': 'resource_modals',
+    'VMResourceModal': 'resource_modals',
+    'DatabaseResourceModal': 'resource_modals',
+    'VPCResourceModal': 'resource_modals',
+    'StorageBucketModal': 'resource_modals'
+}
 
 __all__ = [
     'DeploymentLobbyView',
@@ -21,3 +40,20 @@ __all__ = [
     'VPCResourceModal',
     'StorageBucketModal'
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
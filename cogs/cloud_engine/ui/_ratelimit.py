@@ -0,0 +1,106 @@
+"""
+Per-channel rate limiting for Discord message edits
+
+Every lobby edits its own messages, so many lobbies in one channel can
+burst past Discord's per-channel budget and push the bot into a global
+back-off. Routing edits through edit_throttled() spaces them out with a
+token bucket per channel instead.
+"""
+
+import asyncio
+from typing import Dict
+
+import discord
+
+
+# Edit budget per channel: EDIT_RATE edits every EDIT_PERIOD seconds
+EDIT_RATE = 5
+EDIT_PERIOD = 5.0
+EDIT_MAX_RETRIES = 3  # Attempts per edit when Discord still answers 429
+
+
+class _TokenBucket:
+    """
+    Token bucket refilled continuously at capacity/period tokens per second
+    
+    acquire() waits for a token; the lock makes waiters queue up in order
+    rather than all waking at once when a token frees up.
+    """
+    
+    __slots__ = ('capacity', 'period', '_tokens', '_updated', '_lock')
+    
+    def __init__(self, capacity: int, period: float):
+        self.capacity = capacity
+        self.period = period
+        self._tokens = float(capacity)
+        self._updated = None
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    refill = (now - self._updated) * self.capacity / self.period
+                    self._tokens = min(self.capacity, self._tokens + refill)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) * self.period / self.capacity)
+
+
+# channel_id -> bucket. Buckets are tiny and channels are few, so they
+# are kept for the life of the process (a weak map would drop a bucket,
+# and its history, as soon as the edit that created it finished).
+_buckets: Dict[int, _TokenBucket] = {}
+
+
+def _bucket_for(channel_id: int) -> _TokenBucket:
+    bucket = _buckets.get(channel_id)
+    if bucket is None:
+        bucket = _buckets[channel_id] = _TokenBucket(EDIT_RATE, EDIT_PERIOD)
+    return bucket
+
+
+def _retry_after(error: discord.HTTPException) -> float:
+    """Seconds Discord asked us to wait, from the Retry-After header"""
+    try:
+        return float(error.response.headers.get('Retry-After', 1.0))
+    except (AttributeError, TypeError, ValueError):
+        return 1.0
+
+
+async def edit_throttled(target, **kwargs):
+    """
+    Edit an interaction's original response or a message, rate limited
+    per channel
+    
+    Args:
+        target: discord.Interaction (edits the original response) or
+            discord.Message
+        **kwargs: Passed through to the edit call
+    
+    Returns: The edited message
+    """
+    if isinstance(target, discord.Interaction):
+        channel_id = target.channel_id
+        edit = target.edit_original_response
+    else:
+        channel_id = target.channel.id
+        edit = target.edit
+    
+    bucket = _bucket_for(channel_id)
+    
+    for attempt in range(EDIT_MAX_RETRIES):
+        await bucket.acquire()
+        try:
+            return await edit(**kwargs)
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == EDIT_MAX_RETRIES - 1:
+                raise
+            await asyncio.sleep(_retry_after(e))
@@ -9,9 +9,41 @@ import discord
 from discord import ui
 from typing import Optional, Callable
 import asyncio
+import itertools
+import time
+from collections import deque
 
 from ..models.session import CloudSession, DeploymentState
 from .resource_modals import create_resource_modal
+from ._ratelimit import edit_throttled, _retry_after
+
+
+# Apply output streaming: the output message is edited at most once per
+# STREAM_EDIT_INTERVAL seconds, and only once STREAM_EDIT_MIN_LINES new
+# lines have arrived, keeping well inside Discord's per-channel edit budget
+STREAM_EDIT_INTERVAL = 2.0
+STREAM_EDIT_MIN_LINES = 10
+STREAM_TAIL_LINES = 50  # Lines shown in the output message
+
+THREAD_CREATE_ATTEMPTS = 3  # Tries at the apply output thread before using the channel
+
+# Session lookups within this many seconds of the last one reuse it
+SESSION_CACHE_TTL = 0.5
+
+RESOURCE_LIST_LIMIT = 10  # Resources listed by name in the lobby embed
+
+# Lobby embed color for each deployment state
+_STATE_COLORS = {
+    DeploymentState.DRAFT: discord.Color.blue(),
+    DeploymentState.VALIDATING: discord.Color.gold(),
+    DeploymentState.PLANNING: discord.Color.gold(),
+    DeploymentState.PLAN_READY: discord.Color.green(),
+    DeploymentState.APPROVED: discord.Color.purple(),
+    DeploymentState.APPLYING: discord.Color.orange(),
+    DeploymentState.APPLIED: discord.Color.dark_green(),
+    DeploymentState.FAILED: discord.Color.red(),
+    DeploymentState.CANCELLED: discord.Color.dark_grey(),
+}
 
 
 class DeploymentLobbyView(ui.View):
@@ -44,9 +76,30 @@ class DeploymentLobbyView(ui.View):
         self.on_approve = on_approve
         self.on_cancel = on_cancel
         
+        # Background tasks (planning, apply streaming, callbacks); holding
+        # references keeps them from being garbage collected mid-run
+        self._tasks = set()
+        
+        # When self.session was last fetched from the orchestrator
+        self._session_fetched_at = float('-inf')
+        
+        # Embed text that depends only on fields fixed at session creation
+        self._embed_title = f"☁️ Cloud Deployment: {session.project_id}"
+        self._embed_provider = f"**Provider:** {session.provider.upper()}"
+        self._embed_session_id = f"`{session.id[:8]}...`"
+        self._embed_footer = f"Created at {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(session.created_at))}"
+        
+        # Rendered resource list as (resources list, count, text); resources
+        # are only ever appended, so the text is rebuilt when either changes
+        self._resource_list = (None, 0, "")
+        
         # Initial state - buttons disabled until plan completes
         self.approve_button.disabled = True
         self.approve_button.style = discord.ButtonStyle.secondary
+        
+        # Button state the message was last sent with; edits only resend
+        # the view when this changes
+        self._sent_component_state = self._component_state()
     
     async def on_view_initialized(self, interaction: discord.Interaction):
         """
@@ -55,7 +108,7 @@ class DeploymentLobbyView(ui.View):
         Immediately starts the planning workflow
         """
         # Start planning in background
-        asyncio.create_task(self._run_planning(interaction))
+        self._spawn(self._run_planning(interaction))
     
     async def _run_planning(self, interaction: discord.Interaction):
         """
@@ -68,7 +121,7 @@ class DeploymentLobbyView(ui.View):
             plan_result = await self.orchestrator.run_plan(self.session.id)
             
             # Refresh session
-            self.session = self.orchestrator.get_session(self.session.id)
+            self.session = self._cached_session()
             
             # Update embed
             embed = self._build_embed()
@@ -79,11 +132,11 @@ class DeploymentLobbyView(ui.View):
                 self.approve_button.style = discord.ButtonStyle.success
             
             # Update message
-            await interaction.edit_original_response(embed=embed, view=self)
+            await edit_throttled(interaction, embed=embed, **self._view_if_changed())
             
             # Call callback
             if self.on_plan_complete:
-                await self.on_plan_complete(plan_result)
+                self._spawn(self.on_plan_complete(plan_result))
         
         except Exception as e:
             # Handle planning errors
@@ -93,7 +146,7 @@ class DeploymentLobbyView(ui.View):
                 color=discord.Color.red()
             )
             
-            await interaction.edit_original_response(embed=embed, view=self)
+            await edit_throttled(interaction, embed=embed, **self._view_if_changed())
     
     @ui.button(label="Approve & Deploy", style=discord.ButtonStyle.secondary, emoji="✅")
     async def approve_button(self, interaction: discord.Interaction, button: ui.Button):
@@ -117,27 +170,24 @@ class DeploymentLobbyView(ui.View):
             )
             return
         
-        # Create thread for apply output
-        thread = await interaction.message.create_thread(
-            name=f"Deploy {self.session.project_id}",
-            auto_archive_duration=60
-        )
+        # Create thread for apply output (falls back to the lobby's channel)
+        thread = await self._create_stream_thread(interaction.message)
+        
+        # Disable buttons (the session is locked from here on) and update
+        # the embed in the same edit
+        self.approve_button.disabled = True
+        self.cancel_button.disabled = True
+        self.add_resource_button.disabled = True
         
-        # Update embed
         embed = self._build_embed()
-        await interaction.edit_original_response(embed=embed, view=self)
+        await edit_throttled(interaction, embed=embed, **self._view_if_changed())
         
         # Start streaming apply output to thread
-        asyncio.create_task(self._stream_apply_output(thread))
-        
-        # Disable buttons
-        self.approve_button.disabled = True
-        self.cancel_button.disabled = True
-        await interaction.edit_original_response(view=self)
+        self._spawn(self._stream_apply_output(thread))
         
         # Call callback
         if self.on_approve:
-            await self.on_approve(thread)
+            self._spawn(self.on_approve(thread))
     
     @ui.button(label="Cancel", style=discord.ButtonStyle.danger, emoji="❌")
     async def cancel_button(self, interaction: discord.Interaction, button: ui.Button):
@@ -156,11 +206,11 @@ class DeploymentLobbyView(ui.View):
                 color=discord.Color.orange()
             )
             
-            await interaction.edit_original_response(embed=embed, view=None)
+            await edit_throttled(interaction, embed=embed, view=None)
         
         # Call callback
         if self.on_cancel:
-            await self.on_cancel()
+            self._spawn(self.on_cancel())
         
         # Stop the view
         self.stop()
@@ -186,7 +236,7 @@ class DeploymentLobbyView(ui.View):
         Refresh button - updates the embed with current session state
         """
         # Refresh session
-        self.session = self.orchestrator.get_session(self.session.id)
+        self.session = self._cached_session()
         
         if not self.session:
             await interaction.response.send_message(
@@ -197,7 +247,7 @@ class DeploymentLobbyView(ui.View):
         
         # Update embed
         embed = self._build_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
+        await interaction.response.edit_message(embed=embed, **self._view_if_changed())
     
     def _build_embed(self) -> discord.Embed:
         """
@@ -210,31 +260,19 @@ class DeploymentLobbyView(ui.View):
         - Cost estimate (if available)
         """
         # Determine embed color based on state
-        state_colors = {
-            DeploymentState.DRAFT: discord.Color.blue(),
-            DeploymentState.VALIDATING: discord.Color.gold(),
-            DeploymentState.PLANNING: discord.Color.gold(),
-            DeploymentState.PLAN_READY: discord.Color.green(),
-            DeploymentState.APPROVED: discord.Color.purple(),
-            DeploymentState.APPLYING: discord.Color.orange(),
-            DeploymentState.APPLIED: discord.Color.dark_green(),
-            DeploymentState.FAILED: discord.Color.red(),
-            DeploymentState.CANCELLED: discord.Color.dark_grey(),
-        }
-        
-        color = state_colors.get(self.session.state, discord.Color.default())
+        color = _STATE_COLORS.get(self.session.state, discord.Color.default())
         
         # Build embed
         embed = discord.Embed(
-            title=f"☁️ Cloud Deployment: {self.session.project_id}",
-            description=f"**Provider:** {self.session.provider.upper()}\n**State:** {self.session.state.value.replace('_', ' ').title()}",
+            title=self._embed_title,
+            description=f"{self._embed_provider}\n**State:** {self.session.state.value.replace('_', ' ').title()}",
             color=color
         )
         
         # Add session info
         embed.add_field(
             name="Session ID",
-            value=f"`{self.session.id[:8]}...`",
+            value=self._embed_session_id,
             inline=True
         )
         
@@ -244,9 +282,10 @@ class DeploymentLobbyView(ui.View):
             inline=True
         )
         
-        # Add time remaining
-        if not self.session.is_expired:
-            minutes_remaining = int(self.session.time_remaining_seconds / 60)
+        # Add time remaining (one clock read for both checks)
+        now = time.time()
+        if not self.session.is_expired_at(now):
+            minutes_remaining = self.session.time_remaining_at(now) // 60
             embed.add_field(
                 name="Time Remaining",
                 value=f"{minutes_remaining} minutes",
@@ -255,17 +294,9 @@ class DeploymentLobbyView(ui.View):
         
         # Add resource list
         if self.session.resources:
-            resource_list = "\n".join([
-                f"- **{r.type}**: {r.config.get('name', 'unnamed')}"
-                for r in self.session.resources[:10]  # Limit to 10
-            ])
-            
-            if len(self.session.resources) > 10:
-                resource_list += f"\n... and {len(self.session.resources) - 10} more"
-            
             embed.add_field(
                 name="📦 Resources",
-                value=resource_list,
+                value=self._resource_list_text(),
                 inline=False
             )
         
@@ -310,7 +341,7 @@ class DeploymentLobbyView(ui.View):
             )
         
         # Add footer
-        embed.set_footer(text=f"Created at {self.session.created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        embed.set_footer(text=self._embed_footer)
         
         return embed
     
@@ -328,32 +359,213 @@ class DeploymentLobbyView(ui.View):
         # Send initial message
         await thread.send("🚀 **Starting deployment...**\n```\n```")
         
-        # Stream output
-        output_buffer = []
+        # Stream output, coalescing lines into rate-limited edits
+        loop = asyncio.get_running_loop()
+        output_buffer = deque(maxlen=STREAM_TAIL_LINES)  # Only the shown tail is kept
         message = None
+        last_sent = None
+        last_edit = float('-inf')
+        new_lines = 0
+        
+        # Wait for each line with a timeout so a quiet stretch (terraform
+        # waiting on a slow resource) still flushes the last few lines.
+        # asyncio.wait() rather than wait_for(): a timeout must leave the
+        # pending read running, since cancelling it would close the
+        # generator and kill terraform.
+        lines = runner.stream_apply().__aiter__()
+        next_line = None
         
-        async for line in runner.stream_apply():
-            output_buffer.append(line)
-            
-            # Update message every 10 lines or 2 seconds
-            if len(output_buffer) >= 10:
-                output_text = "\n".join(output_buffer[-50:])  # Keep last 50 lines
+        try:
+            while True:
+                if next_line is None:
+                    next_line = asyncio.ensure_future(lines.__anext__())
                 
-                if message:
+                done, _ = await asyncio.wait({next_line}, timeout=STREAM_EDIT_INTERVAL)
+                now = loop.time()
+                
+                if done:
                     try:
-                        await message.edit(content=f"```\n{output_text}\n```")
-                    except discord.errors.NotFound:
-                        message = await thread.send(f"```\n{output_text}\n```")
-                else:
-                    message = await thread.send(f"```\n{output_text}\n```")
+                        line = next_line.result()
+                    except StopAsyncIteration:
+                        break
+                    finally:
+                        next_line = None
+                    
+                    output_buffer.append(line)
+                    new_lines += 1
+                    
+                    if new_lines < STREAM_EDIT_MIN_LINES or now - last_edit < STREAM_EDIT_INTERVAL:
+                        continue
+                elif not new_lines:
+                    continue
+                
+                # Enough new lines, or a full interval without any: edit.
+                # Each wait starts after the previous edit, so a timeout
+                # also keeps edits at least STREAM_EDIT_INTERVAL apart.
+                output_text = "\n".join(output_buffer)
+                message, last_sent = await self._publish_output(thread, message, output_text, last_sent)
+                last_edit = now
+                new_lines = 0
+        finally:
+            if next_line is not None:
+                next_line.cancel()
+        
+        # Flush lines that arrived since the last edit, still respecting the interval
+        if new_lines:
+            await asyncio.sleep(max(0.0, last_edit + STREAM_EDIT_INTERVAL - loop.time()))
+            output_text = "\n".join(output_buffer)
+            message, last_sent = await self._publish_output(thread, message, output_text, last_sent)
         
         # Send final summary
-        self.session = self.orchestrator.get_session(self.session.id)
+        self.session = self._cached_session()
         
         if self.session.state == DeploymentState.APPLIED:
             await thread.send("✅ **Deployment completed successfully!**")
         else:
             await thread.send("❌ **Deployment failed. Check the output above for errors.**")
+    
+    async def _publish_output(
+        self,
+        thread: discord.Thread,
+        message: Optional[discord.Message],
+        output_text: str,
+        last_sent: Optional[str]
+    ):
+        """
+        Show output_text in the thread's output message
+        
+        Edits the existing message (or sends one if there is none or it
+        was deleted). Skips the request entirely when the text is what
+        was last sent.
+        
+        Returns: (message, text now shown)
+        """
+        if output_text == last_sent and message is not None:
+            return message, last_sent
+        
+        content = f"```\n{output_text}\n```"
+        
+        if message:
+            try:
+                await edit_throttled(message, content=content)
+                return message, output_text
+            except discord.errors.NotFound:
+                pass
+        
+        return await thread.send(content), output_text
+    
+    async def _create_stream_thread(self, message: discord.Message):
+        """
+        Create the apply output thread on the lobby message
+        
+        Retries rate limits (after Retry-After) and 5xx errors (after
+        1s, 2s, ...). If the thread still can't be created, returns the
+        message's channel so the output is posted there instead of being
+        lost; the apply is already running by this point.
+        """
+        error = None
+        
+        for attempt in range(THREAD_CREATE_ATTEMPTS):
+            try:
+                return await message.create_thread(
+                    name=f"Deploy {self.session.project_id}",
+                    auto_archive_duration=60
+                )
+            except discord.HTTPException as e:
+                error = e
+                
+                if e.status == 429:
+                    delay = _retry_after(e)
+                elif e.status >= 500:
+                    delay = 2 ** attempt
+                else:
+                    break
+                
+                if attempt < THREAD_CREATE_ATTEMPTS - 1:
+                    await asyncio.sleep(delay)
+        
+        print(f"⚠️ Could not create output thread for session {self.session.id}: {error}; posting to the channel")
+        return message.channel
+    
+    def _component_state(self) -> tuple:
+        """Button attributes that change over the lobby's life"""
+        return (
+            self.approve_button.disabled,
+            self.approve_button.style,
+            self.cancel_button.disabled,
+            self.add_resource_button.disabled
+        )
+    
+    def _view_if_changed(self) -> dict:
+        """
+        Edit kwargs carrying the view, or none if the buttons are unchanged
+        since the last edit that sent them
+        
+        Leaving view out keeps the message's existing components.
+        """
+        state = self._component_state()
+        if state == self._sent_component_state:
+            return {}
+        
+        self._sent_component_state = state
+        return {'view': self}
+    
+    def _resource_list_text(self) -> str:
+        """Resource list field text, re-rendered only when resources change"""
+        resources = self.session.resources
+        count = len(resources)
+        cached_resources, cached_count, text = self._resource_list
+        
+        if resources is not cached_resources or count != cached_count:
+            text = "\n".join(
+                f"- **{r.type}**: {r.config.get('name', 'unnamed')}"
+                for r in itertools.islice(resources, RESOURCE_LIST_LIMIT)
+            )
+            
+            if count > RESOURCE_LIST_LIMIT:
+                text += f"\n... and {count - RESOURCE_LIST_LIMIT} more"
+            
+            self._resource_list = (resources, count, text)
+        
+        return text
+    
+    def _cached_session(self) -> Optional[CloudSession]:
+        """
+        Current session from the orchestrator, reusing self.session if it
+        was fetched less than SESSION_CACHE_TTL seconds ago
+        
+        Saves a database read when a session that fell out of the
+        orchestrator's cache is looked up repeatedly in quick succession.
+        """
+        now = time.monotonic()
+        if now - self._session_fetched_at < SESSION_CACHE_TTL:
+            return self.session
+        
+        session = self.orchestrator.get_session(self.session.id)
+        if session is not None:
+            self._session_fetched_at = now
+        return session
+    
+    def _spawn(self, coro):
+        """
+        Run coro as a background task so the calling handler returns
+        without waiting on it; failures are reported when the task ends
+        """
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._on_task_done)
+        return task
+    
+    def _on_task_done(self, task: asyncio.Task):
+        """Drop a finished background task and report its exception, if any"""
+        self._tasks.discard(task)
+        
+        if task.cancelled():
+            return
+        
+        exc = task.exception()
+        if exc is not None:
+            print(f"❌ Lobby task {task.get_coro().__qualname__} failed for session {self.session.id}: {exc}")
 
 
 class ResourceTypeSelectView(ui.View):
@@ -8,6 +8,8 @@ import discord
 from discord import ui
 from typing import Optional, Literal
 
+from ..core.cost_estimator import CostEstimator
+
 
 class VMResourceModal(ui.Modal, title="Configure Virtual Machine"):
     """Modal for configuring compute VMs"""
@@ -64,6 +66,10 @@ class VMResourceModal(ui.Modal, title="Configure Virtual Machine"):
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
         
+        # Acknowledge first so the work below can't outlast Discord's
+        # 3 second response window
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
         # Build config
         config = {
             'name': self.vm_name.value,
@@ -98,7 +104,6 @@ class VMResourceModal(ui.Modal, title="Configure Virtual Machine"):
         
         if success:
             # Get cost estimate
-            from ..core.cost_estimator import CostEstimator
             estimate = CostEstimator.estimate_resource(
                 self.provider,
                 'compute_vm',
@@ -131,9 +136,9 @@ class VMResourceModal(ui.Modal, title="Configure Virtual Machine"):
                     inline=False
                 )
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "❌ Failed to add VM. Session may be locked or expired.",
                 ephemeral=True
             )
@@ -185,6 +190,10 @@ class DatabaseResourceModal(ui.Modal, title="Configure Database"):
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
         
+        # Acknowledge first so the work below can't outlast Discord's
+        # 3 second response window
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
         config = {
             'name': self.db_name.value,
             'database_type': self.db_type.value,
@@ -210,7 +219,6 @@ class DatabaseResourceModal(ui.Modal, title="Configure Database"):
         )
         
         if success:
-            from ..core.cost_estimator import CostEstimator
             estimate = CostEstimator.estimate_resource(
                 self.provider,
                 'database',
@@ -235,9 +243,9 @@ class DatabaseResourceModal(ui.Modal, title="Configure Database"):
                 inline=False
             )
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "❌ Failed to add database.",
                 ephemeral=True
             )
@@ -283,6 +291,10 @@ class VPCResourceModal(ui.Modal, title="Configure VPC/Network"):
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
         
+        # Acknowledge first so the work below can't outlast Discord's
+        # 3 second response window
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
         config = {
             'name': self.vpc_name.value,
             'cidr_block': self.cidr_block.value,
@@ -311,9 +323,9 @@ class VPCResourceModal(ui.Modal, title="Configure VPC/Network"):
                 inline=False
             )
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "❌ Failed to add VPC.",
                 ephemeral=True
             )
@@ -360,6 +372,10 @@ class StorageBucketModal(ui.Modal, title="Configure Storage Bucket"):
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
         
+        # Acknowledge first so the work below can't outlast Discord's
+        # 3 second response window
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        
         config = {
             'name': self.bucket_name.value,
             'storage_class': self.storage_class.value,
@@ -393,9 +409,9 @@ class StorageBucketModal(ui.Modal, title="Configure Storage Bucket"):
                 inline=False
             )
             
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            await interaction.followup.send(embed=embed, ephemeral=True)
         else:
-            await interaction.response.send_message(
+            await interaction.followup.send(
                 "❌ Failed to add storage bucket.",
                 ephemeral=True
             )